@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import json
+import logging
+import platform
+import random
+import re
+import statistics
+import tempfile
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+from selenium.webdriver.common.by import By
+
+from config.settings import BENCHMARK_REGRESSION_THRESHOLD
+from src.servant_xbot.amazon.affiliate import LINK_TEXTAREA_SELECTORS
+from src.servant_xbot.amazon.page_parser import (
+    PageParser,
+    available_backends,
+    parse_product_page,
+)
+from src.servant_xbot.amazon.scraper import (
+    NAME_SELECTORS,
+    PRICE_SELECTORS,
+    AmazonScraper,
+)
+from src.servant_xbot.models.product import Product
+from src.servant_xbot.models.product_batch import ProductBatch
+from src.servant_xbot.utils.helpers import (
+    clean_product_name,
+    extract_price_from_text,
+    is_amazon_affiliate_link,
+)
+from src.servant_xbot.utils.prices import parse_prices
+from src.servant_xbot.utils.rate_limiter import RateLimiter
+from src.servant_xbot.utils.screenshots import ScreenshotRecorder
+from src.servant_xbot.utils.selector_registry import SelectorRegistry
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCHMARKS_DIR / "fixtures"
+BASELINES_PATH = BENCHMARKS_DIR / "baselines.json"
+
+# Items in each synthetic batch
+BATCH_SIZE = 1000
+
+# Products in the catalogs whose memory is measured
+CATALOG_SIZE = 100_000
+
+# Passes over the suite whose median is stored by --update-baselines
+BASELINE_PASSES = 3
+
+# Measurements repeated before reporting a case as regressed
+CONFIRM_RUNS = 2
+
+PRICE_TEXTS = [
+    "R$ 1.234,56",
+    "R$12,90",
+    "R$\xa0349,00",
+    "De: R$ 99,00 Por: R$ 79,90",
+    "R$ 12.499,99 no Pix",
+    "Em até 10x R$ 49,90 sem juros",
+    "R$\n2.399\n,\n00",
+    "1.234,",
+    "R$ 49,90 - R$ 89,90",
+    "Indisponível",
+    "",
+]
+
+NAME_WORDS = (
+    "fone de ouvido bluetooth smart watch cafeteira expresso air fryer kit "
+    "panelas mochila notebook teclado mecânico mouse gamer garrafa térmica"
+).split()
+
+
+# Input of the reference workload
+REFERENCE_WORDS = NAME_WORDS * 20
+
+
+def reference_workload() -> list:
+    """Fixed pure-Python string and dict work, timed next to every case.
+
+    Throughputs are stored relative to it, so a machine running slower or
+    faster as a whole moves both and the ratio stays put.
+    """
+    counts = {}
+    for word in REFERENCE_WORDS:
+        key = word.upper().strip()
+        counts[key] = counts.get(key, 0) + len(key)
+    return sorted(counts.items())
+
+
+@dataclass
+class Case:
+    """A hot path measured by the suite."""
+
+    name: str
+    func: Callable[[], object]
+    # Items processed by one call, so batches report per-item throughput
+    ops: int = 1
+
+
+class FixtureDriver:
+    """Returns recorded bestseller cards instead of running the script."""
+
+    def __init__(self, cards_json: str):
+        self.cards_json = cards_json
+
+    def execute_script(self, script: str) -> str:
+        return self.cards_json
+
+
+def legacy_extract_prices(texts: List[str]) -> List[float]:
+    """The per-item price loop the scraper used before ``utils.prices``.
+
+    Kept as the reference the shared parser is measured against.
+    """
+    prices = []
+    for text in texts:
+        try:
+            price_match = re.search(r"R\$\s*([\d.,]+)", text)
+            if price_match:
+                price_str = price_match.group(1).replace(".", "").replace(",", ".")
+                prices.append(float(price_str))
+        except (ValueError, AttributeError):
+            continue
+    return prices
+
+
+def load_fixture(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def synthetic_products(count: int, seed: int = 42) -> List[Product]:
+    """Build a reproducible batch of products shaped like scraped ones."""
+    rng = random.Random(seed)
+    updated_at = datetime(2026, 1, 1)
+    products = []
+    for index in range(count):
+        asin = "B0" + "".join(rng.choices("ABCDEFGHJKLMNPQRSTUVWXYZ0123456789", k=8))
+        price = round(rng.uniform(10, 5000), 2)
+        products.append(
+            Product(
+                name=" ".join(rng.choices(NAME_WORDS, k=rng.randint(4, 12))),
+                url=f"https://www.amazon.com.br/dp/{asin}",
+                price=price,
+                affiliate_url=f"https://amzn.to/{asin[2:]}" if index % 2 else None,
+                last_price=round(price * rng.uniform(0.8, 1.2), 2),
+                updated_at=updated_at + timedelta(minutes=index),
+                rank=index % 50 + 1,
+            )
+        )
+    return products
+
+
+def bestseller_cards(html_body: str) -> str:
+    """Read the grid fixture into the JSON returned by the extraction script."""
+    soup = BeautifulSoup(html_body, "html.parser")
+    cards = []
+    for index, card in enumerate(soup.select("#gridItemRoot")):
+        name = card.select_one("._cDEzb_p13n-sc-css-line-clamp-3_g3dy1")
+        price = card.select_one("._cDEzb_p13n-sc-price_3mJ9Z")
+        link = card.select_one("a[href*='/dp/']")
+        badge = card.select_one(".zg-bdg-text")
+        cards.append(
+            {
+                "name": name.get_text(strip=True) if name else "",
+                "price": price.get_text(strip=True) if price else "",
+                "href": "https://www.amazon.com.br" + link["href"] if link else "",
+                "rank": int(badge.get_text().strip("#")) if badge else index + 1,
+            }
+        )
+    return json.dumps(cards)
+
+
+def build_cases(scratch: Path) -> List[Case]:
+    """Set up every benchmark case over the fixtures and synthetic batches."""
+    product_page = load_fixture("product_page.html")
+    grid_cards = bestseller_cards(load_fixture("bestseller_grid.html"))
+    popover = load_fixture("sitestripe_popover.html")
+
+    price_texts = [PRICE_TEXTS[i % len(PRICE_TEXTS)] for i in range(BATCH_SIZE)]
+    products = synthetic_products(BATCH_SIZE)
+    names = [f"  {product.name}  \n  ({i})  " for i, product in enumerate(products)]
+    stored = [product.to_dict() for product in products]
+    batch = ProductBatch.from_records(stored)
+    catalog = [product.to_dict() for product in synthetic_products(CATALOG_SIZE)]
+
+    # Scratch collaborators: no throttling, no screenshots, and selector
+    # statistics kept out of the ones used by real runs
+    scraper = AmazonScraper(
+        FixtureDriver(grid_cards),
+        None,
+        rate_limiter=RateLimiter(
+            initial_per_minute=1e9,
+            min_per_minute=1e9,
+            max_per_minute=1e9,
+            jitter=0,
+        ),
+        selectors=SelectorRegistry(scratch / "selector_stats.json"),
+        screenshots=ScreenshotRecorder(scratch / "screenshots", mode="off"),
+        # Parse inline: the suite measures parsing, not process hand-off
+        parser=PageParser(processes=0),
+    )
+    card_count = len(json.loads(grid_cards))
+
+    textarea_selectors = [
+        f"#{selector}" if by == By.ID else selector
+        for by, selector in LINK_TEXTAREA_SELECTORS
+        if by in (By.ID, By.CSS_SELECTOR)
+    ]
+
+    def read_affiliate_link():
+        soup = BeautifulSoup(popover, "html.parser")
+        for selector in textarea_selectors:
+            textarea = soup.select_one(selector)
+            if textarea and is_amazon_affiliate_link(textarea.get_text(strip=True)):
+                return textarea.get_text(strip=True)
+        return None
+
+    # Every installed backend, with and without the subtree restriction
+    backend_cases = [
+        Case(
+            f"parser.product_page[{backend}{', restricted' if restrict else ''}]",
+            lambda backend=backend, restrict=restrict: parse_product_page(
+                product_page, PRICE_SELECTORS, NAME_SELECTORS, backend, restrict
+            ),
+        )
+        for backend in available_backends()
+        for restrict in ((False,) if backend == "selectolax" else (False, True))
+    ]
+
+    return backend_cases + [
+        Case(
+            "helpers.extract_price_from_text",
+            lambda: [extract_price_from_text(text) for text in price_texts],
+            BATCH_SIZE,
+        ),
+        # The shared parser, per item and batched, against the loop it replaced
+        Case(
+            "prices.legacy_loop[reference]",
+            lambda: legacy_extract_prices(price_texts),
+            BATCH_SIZE,
+        ),
+        Case("prices.parse_prices", lambda: parse_prices(price_texts), BATCH_SIZE),
+        Case(
+            "helpers.clean_product_name",
+            lambda: [clean_product_name(name) for name in names],
+            BATCH_SIZE,
+        ),
+        Case(
+            "product.to_dict",
+            lambda: [product.to_dict() for product in products],
+            BATCH_SIZE,
+        ),
+        Case(
+            "product.from_dict",
+            lambda: [Product.from_dict(data) for data in stored],
+            BATCH_SIZE,
+        ),
+        Case(
+            "product_batch.from_records",
+            lambda: ProductBatch.from_records(stored),
+            BATCH_SIZE,
+        ),
+        Case("product_batch.to_dicts", batch.to_dicts, BATCH_SIZE),
+        # Peak memory of holding a whole catalog, as products or as a batch
+        Case(
+            "catalog_100k[products]",
+            lambda: [Product.from_dict(data) for data in catalog],
+            CATALOG_SIZE,
+        ),
+        Case(
+            "catalog_100k[batch]",
+            lambda: ProductBatch.from_records(catalog),
+            CATALOG_SIZE,
+        ),
+        Case(
+            "scraper.product_page",
+            lambda: scraper._submit_parse(
+                product_page, "https://www.amazon.com.br/dp/B0BENCHMARK"
+            ).result(),
+        ),
+        Case("scraper.bestseller_cards", scraper._extract_bestsellers_bulk, card_count),
+        Case("affiliate.sitestripe_popover", read_affiliate_link),
+    ]
+
+
+def measure(case: Case, repeat: int) -> Dict[str, float]:
+    """Measure the throughput and peak memory of a case.
+
+    Throughput is taken from the fastest of ``repeat`` rounds of at least
+    0.2 seconds each. Every round is followed by a round of the reference
+    workload, and the relative throughput is the median ratio of the paired
+    rounds, so a slowdown of the machine during one round cancels out. Peak
+    memory is traced in a separate call, so tracing does not slow the timed
+    rounds.
+    """
+    timer = timeit.Timer(case.func)
+    number, _ = timer.autorange()
+    reference = timeit.Timer(reference_workload)
+    reference_number, _ = reference.autorange()
+
+    times = []
+    ratios = []
+    for _ in range(repeat):
+        times.append(timer.timeit(number))
+        reference_time = reference.timeit(reference_number)
+        ratios.append((reference_time / reference_number) / (times[-1] / number))
+    ops_per_sec = number * case.ops / min(times)
+
+    tracemalloc.start()
+    try:
+        case.func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ops_per_sec": ops_per_sec,
+        "relative": statistics.median(ratios) * case.ops,
+        "peak_kb": peak / 1024,
+    }
+
+
+def throughput_change(result: Dict[str, float], baseline: Dict[str, float]) -> float:
+    """Change of throughput against a baseline, relative when it has one."""
+    key = "relative" if "relative" in baseline else "ops_per_sec"
+    return result[key] / baseline[key] - 1
+
+
+def regressions(
+    result: Dict[str, float], baseline: Dict[str, float], threshold: float
+) -> List[str]:
+    """Describe how a result regressed past the threshold, if it did."""
+    problems = []
+    change = throughput_change(result, baseline)
+    if change < -threshold:
+        problems.append(
+            f"throughput {change:+.1%} relative to the reference workload"
+            if "relative" in baseline
+            else f"throughput {result['ops_per_sec']:,.0f} ops/s vs "
+            f"{baseline['ops_per_sec']:,.0f} baseline"
+        )
+    if result["peak_kb"] > baseline["peak_kb"] * (1 + threshold):
+        problems.append(
+            f"peak memory {result['peak_kb']:,.1f} KB vs "
+            f"{baseline['peak_kb']:,.1f} KB baseline"
+        )
+    return problems
+
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parsing and serialization hot paths"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=BENCHMARK_REGRESSION_THRESHOLD,
+        help="Fail when a case is this much slower or larger than its baseline "
+        f"(default: {BENCHMARK_REGRESSION_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--baselines",
+        type=Path,
+        default=BASELINES_PATH,
+        help="Stored baseline results",
+    )
+    parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help="Store this run's results as the new baselines",
+    )
+    parser.add_argument(
+        "--filter", default="", help="Only run the cases whose name contains this"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=7, help="Timed rounds per case (default: 7)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+    # Keep the per-page scraper logs out of the measurement
+    logging.getLogger("src.servant_xbot").setLevel(logging.WARNING)
+    logger = logging.getLogger(__name__)
+
+    try:
+        with open(args.baselines, "r") as file:
+            baselines = json.load(file).get("cases", {})
+    except FileNotFoundError:
+        baselines = {}
+
+    scratch = Path(tempfile.mkdtemp(prefix="servant_xbot_benchmark_"))
+    cases = [case for case in build_cases(scratch) if args.filter in case.name]
+
+    # New baselines are the median of whole passes over the suite, so one
+    # pass that ran while the machine was busy does not skew them
+    runs = {case.name: [] for case in cases}
+    for _ in range(BASELINE_PASSES if args.update_baselines else 1):
+        for case in cases:
+            runs[case.name].append(measure(case, args.repeat))
+
+    results = {}
+    failures = 0
+    for case in cases:
+        result = sorted(runs[case.name], key=lambda run: run["relative"])[
+            len(runs[case.name]) // 2
+        ]
+        baseline = baselines.get(case.name)
+        if baseline and not args.update_baselines:
+            # A real regression shows on every measurement, a busy moment of
+            # the machine does not, so confirm before failing
+            for _ in range(CONFIRM_RUNS):
+                if not regressions(result, baseline, args.threshold):
+                    break
+                retry = measure(case, args.repeat)
+                if retry["relative"] > result["relative"]:
+                    result = retry
+        results[case.name] = result
+
+        line = (
+            f"{case.name:<44} {result['ops_per_sec']:>14,.0f} ops/s "
+            f"{result['peak_kb']:>10,.1f} KB peak"
+        )
+        if baseline:
+            line += f"  {throughput_change(result, baseline):+.1%} vs baseline"
+            problems = regressions(result, baseline, args.threshold)
+            if problems and not args.update_baselines:
+                failures += 1
+                line += "  REGRESSED: " + "; ".join(problems)
+        logger.info(line)
+
+    if args.update_baselines:
+        baselines.update(results)
+        state = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cases": baselines,
+        }
+        with open(args.baselines, "w") as file:
+            json.dump(state, file, indent=2, sort_keys=True)
+            file.write("\n")
+        logger.info(f"Stored {len(results)} baselines in {args.baselines}")
+    elif failures:
+        logger.error(
+            f"{failures} cases regressed more than {args.threshold:.0%} "
+            "against their baselines"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,19 +8,97 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 CREDENTIALS_DIR = DATA_DIR / "credentials"
 OUTPUT_DIR = DATA_DIR / "output"
+CACHE_DIR = DATA_DIR / "cache"
+PRICE_HISTORY_DIR = DATA_DIR / "price_history"
 
 # Create directories if they don't exist
 CREDENTIALS_DIR.mkdir(parents=True, exist_ok=True)
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 AMAZON_EMAIL = os.getenv("AMAZON_EMAIL")
 AMAZON_PASSWORD = os.getenv("AMAZON_PASSWORD")
 
 FIREBASE_CREDENTIALS_PATH = CREDENTIALS_DIR / "firebase_credentials.json"
 FIREBASE_DATABASE_URL = os.getenv("FIREBASE_DATABASE_URL")
+FIREBASE_BATCH_SIZE = int(os.getenv("FIREBASE_BATCH_SIZE", "50"))
+FIREBASE_PAGE_SIZE = int(os.getenv("FIREBASE_PAGE_SIZE", "500"))
+# Database paths kept by the read cache, 0 disables it
+FIREBASE_CACHE_SIZE = int(os.getenv("FIREBASE_CACHE_SIZE", "1024"))
+# Seconds a cached product stays fresh
+FIREBASE_CACHE_TTL_SECONDS = float(os.getenv("FIREBASE_CACHE_TTL_SECONDS", "300"))
+# Seconds the cached /last_item stays fresh; short, as other processes add items
+FIREBASE_CACHE_LAST_ITEM_TTL_SECONDS = float(
+    os.getenv("FIREBASE_CACHE_LAST_ITEM_TTL_SECONDS", "10")
+)
+# Comma-separated paths whose remote changes invalidate the cache, e.g.
+# "/last_item". Each listener first downloads its whole path, so avoid "/items"
+# on a large catalog.
+FIREBASE_CACHE_LISTEN_PATHS = [
+    path.strip()
+    for path in os.getenv("FIREBASE_CACHE_LISTEN_PATHS", "").split(",")
+    if path.strip()
+]
 
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+# Block images, fonts, media and trackers in the browsers used for scraping
+BROWSER_LEAN_PROFILE = os.getenv("BROWSER_LEAN_PROFILE", "true").lower() == "true"
+# Keep each pool worker's Chrome profile between runs, so a signed-in session
+# survives and startup skips the cookie replay
+BROWSER_PERSISTENT_PROFILE = (
+    os.getenv("BROWSER_PERSISTENT_PROFILE", "true").lower() == "true"
+)
+BROWSER_PROFILES_DIR = CACHE_DIR / "browser_profiles"
+
+# Requests per minute shared by every driver and HTTP client
+RATE_LIMIT_INITIAL_PER_MINUTE = float(os.getenv("RATE_LIMIT_INITIAL_PER_MINUTE", "20"))
+RATE_LIMIT_MIN_PER_MINUTE = float(os.getenv("RATE_LIMIT_MIN_PER_MINUTE", "4"))
+RATE_LIMIT_MAX_PER_MINUTE = float(os.getenv("RATE_LIMIT_MAX_PER_MINUTE", "60"))
+RATE_LIMIT_JITTER = float(os.getenv("RATE_LIMIT_JITTER", "0.5"))
+# Seconds to wait for a page's content before scraping whatever is there
+PAGE_READY_TIMEOUT = float(os.getenv("PAGE_READY_TIMEOUT", "15"))
+
+# Product page parser: selectolax, lxml, html.parser or auto (fastest installed)
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto")
+# Only parse the title and buybox subtrees of product pages
+PARSER_RESTRICT_SUBTREES = (
+    os.getenv("PARSER_RESTRICT_SUBTREES", "false").lower() == "true"
+)
+# Processes parsing product pages off the browser threads, 0 parses inline
+PARSER_PROCESSES = int(os.getenv("PARSER_PROCESSES", "2"))
+
+# Pickled cookies of older versions, migrated into the session store
 COOKIES_PATH = CREDENTIALS_DIR / "amazon_cookies.pkl"
+SESSION_STORE_PATH = CREDENTIALS_DIR / "amazon_session.json"
+# Log in again when the session expires within this many hours
+SESSION_REFRESH_MARGIN_HOURS = float(os.getenv("SESSION_REFRESH_MARGIN_HOURS", "24"))
 BESTSELLER_TOPICS_PATH = DATA_DIR / "bestseller_topics.txt"
 PRODUCT_LINKS_PATH = OUTPUT_DIR / "product_links.txt"
 AFFILIATE_LINKS_PATH = OUTPUT_DIR / "affiliate_links.txt"
 ERROR_LOG_PATH = OUTPUT_DIR / "errors.log"
+
+SCREENSHOT_DIR = OUTPUT_DIR / "screenshots"
+# off, failure (only when something went wrong) or sampled (failures plus a
+# random share of the other pages)
+SCREENSHOT_MODE = os.getenv("SCREENSHOT_MODE", "failure")
+SCREENSHOT_SAMPLE_RATE = float(os.getenv("SCREENSHOT_SAMPLE_RATE", "0.05"))
+SCREENSHOT_MAX_MB = float(os.getenv("SCREENSHOT_MAX_MB", "50"))
+
+AFFILIATE_CACHE_PATH = CACHE_DIR / "affiliate_links.sqlite3"
+# Days before a cached affiliate link is regenerated, 0 keeps links forever
+AFFILIATE_CACHE_TTL_DAYS = float(os.getenv("AFFILIATE_CACHE_TTL_DAYS", "0"))
+DEDUPE_INDEX_PATH = CACHE_DIR / "dedupe_index.sqlite3"
+SELECTOR_STATS_PATH = CACHE_DIR / "selector_stats.json"
+PAGE_CORPUS_PATH = CACHE_DIR / "page_corpus.sqlite3"
+
+JOURNAL_DIR = CACHE_DIR / "journals"
+
+REFRESH_QUEUE_PATH = CACHE_DIR / "refresh_queue.json"
+REFRESH_BASE_INTERVAL_HOURS = float(os.getenv("REFRESH_BASE_INTERVAL_HOURS", "24"))
+# Product pages refreshed per hour by update_products.py, 0 refreshes everything
+REFRESH_PAGES_PER_HOUR = int(os.getenv("REFRESH_PAGES_PER_HOUR", "0"))
+
+# Share by which a benchmark may run slower, or peak higher, than its baseline
+BENCHMARK_REGRESSION_THRESHOLD = float(
+    os.getenv("BENCHMARK_REGRESSION_THRESHOLD", "0.25")
+)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+
+from config.settings import PAGE_CORPUS_PATH
+from src.servant_xbot.amazon.replay import ReplayDriver, ReplayHttpClient
+from src.servant_xbot.amazon.scraper import AmazonScraper
+from src.servant_xbot.database.page_corpus import (
+    BESTSELLER_PAGE,
+    PRODUCT_PAGE,
+    PageCorpus,
+)
+from src.servant_xbot.utils.helpers import setup_chrome_driver
+from src.servant_xbot.utils.rate_limiter import RateLimiter
+from src.servant_xbot.utils.screenshots import ScreenshotRecorder
+from src.servant_xbot.utils.selector_registry import SelectorRegistry
+
+
+def report(logger, label, timings, parsed):
+    """Log the throughput of one page type."""
+    if not timings:
+        logger.info(f"{label}: no recorded pages")
+        return
+    total = sum(timings)
+    ms = sorted(t * 1000 for t in timings)
+    logger.info(
+        f"{label}: {len(timings)} pages, {parsed} parsed, "
+        f"{len(timings) / total:.1f} pages/s, "
+        f"{statistics.mean(ms):.1f} ms/page "
+        f"(p50 {ms[len(ms) // 2]:.1f}, p95 {ms[int(len(ms) * 0.95)]:.1f})"
+    )
+
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(
+        description="Replay recorded Amazon pages through the scraper offline"
+    )
+    parser.add_argument(
+        "--corpus",
+        type=Path,
+        default=PAGE_CORPUS_PATH,
+        help="Page corpus recorded with --record-pages",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Passes over the corpus"
+    )
+    parser.add_argument(
+        "--browser",
+        action="store_true",
+        help="Also replay the bestseller pages in a headless, offline Chrome",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler()],
+    )
+    # Keep the per-page scraper logs out of the measurement
+    logging.getLogger("src.servant_xbot").setLevel(logging.WARNING)
+    logger = logging.getLogger(__name__)
+
+    if not Path(args.corpus).exists():
+        logger.error(f"Page corpus not found: {args.corpus}")
+        return
+    corpus = PageCorpus(args.corpus)
+    logger.info(f"Replaying {corpus.count()} recorded pages from {args.corpus}")
+
+    # No throttling, and selector statistics kept out of the real ones
+    scratch = Path(tempfile.mkdtemp(prefix="servant_xbot_benchmark_"))
+    rate_limiter = RateLimiter(
+        initial_per_minute=1e9, min_per_minute=1e9, max_per_minute=1e9, jitter=0
+    )
+    selectors = SelectorRegistry(scratch / "selector_stats.json")
+    screenshots = ScreenshotRecorder(scratch / "screenshots", mode="off")
+
+    driver = None
+    if args.browser:
+        driver = ReplayDriver(setup_chrome_driver(headless=True, lean=True), corpus)
+
+    try:
+        # Product pages go through the HTTP fast path, as in update_products
+        scraper = AmazonScraper(
+            driver,
+            None,
+            http_client=ReplayHttpClient(corpus),
+            rate_limiter=rate_limiter,
+            selectors=selectors,
+            screenshots=screenshots,
+        )
+        timings, parsed = [], 0
+        for _ in range(args.repeat):
+            for url, _, _, _ in corpus.iter_pages(PRODUCT_PAGE):
+                start = time.perf_counter()
+                product = scraper.get_product_details(url)
+                timings.append(time.perf_counter() - start)
+                parsed += product is not None
+        report(logger, "Product pages", timings, parsed)
+
+        if driver:
+            # Bestseller grids are parsed in the browser, as in get_bestsellers
+            scraper = AmazonScraper(
+                driver,
+                None,
+                rate_limiter=rate_limiter,
+                selectors=selectors,
+                screenshots=screenshots,
+            )
+            timings, parsed = [], 0
+            for _ in range(args.repeat):
+                for url, _, _, _ in corpus.iter_pages(BESTSELLER_PAGE):
+                    start = time.perf_counter()
+                    parsed += len(scraper.get_bestsellers(url))
+                    timings.append(time.perf_counter() - start)
+            report(logger, "Bestseller pages", timings, parsed)
+        elif corpus.count(BESTSELLER_PAGE):
+            logger.info("Bestseller pages skipped, pass --browser to replay them")
+
+    finally:
+        if driver:
+            driver.quit()
+        corpus.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,70 @@ from pathlib import Path
 # Add the project root to Python path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+import asyncio
+import argparse
 import logging
-import time
-import random
-import undetected_chromedriver as uc
-from selenium.webdriver.support.wait import WebDriverWait
+import threading
 
 from config.settings import BESTSELLER_TOPICS_PATH, AFFILIATE_LINKS_PATH, ERROR_LOG_PATH
-from src.servant_xbot.amazon.auth import AmazonAuthenticator
+from src.servant_xbot.amazon.driver_pool import DriverPool
 from src.servant_xbot.amazon.scraper import AmazonScraper
 from src.servant_xbot.amazon.affiliate import AffiliateGenerator
+from src.servant_xbot.database.affiliate_cache import AffiliateLinkCache
+from src.servant_xbot.database.dedupe import DedupeIndex
 from src.servant_xbot.database.firebase import FirebaseManager
+from src.servant_xbot.database.page_corpus import PageCorpus
+from src.servant_xbot.database.run_journal import RunJournal
+from src.servant_xbot.models.product import Product
+from src.servant_xbot.utils.rate_limiter import get_shared_rate_limiter
+from src.servant_xbot.utils.screenshots import get_shared_screenshot_recorder
+from src.servant_xbot.utils.selector_registry import get_shared_selector_registry
+from src.servant_xbot.pipeline import Pipeline, Stage
+from src.servant_xbot.scheduler import RefreshScheduler
 
 
 def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description="Scrape Amazon bestsellers")
+    parser.add_argument(
+        "--browsers", type=int, default=1, help="Number of Chrome instances"
+    )
+    parser.add_argument(
+        "--discovery-workers",
+        type=int,
+        default=1,
+        help="Concurrent category discovery workers",
+    )
+    parser.add_argument(
+        "--affiliate-workers",
+        type=int,
+        default=1,
+        help="Concurrent product detail/affiliate workers",
+    )
+    parser.add_argument(
+        "--persistence-workers",
+        type=int,
+        default=1,
+        help="Concurrent database/file workers",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=20,
+        help="Maximum number of items waiting in front of each stage",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the categories already scraped by an interrupted run",
+    )
+    parser.add_argument(
+        "--record-pages",
+        action="store_true",
+        help="Archive the bestseller pages for offline replay benchmarks",
+    )
+    args = parser.parse_args()
+
     # Ensure all directories exist
     Path(BESTSELLER_TOPICS_PATH).parent.mkdir(parents=True, exist_ok=True)
     Path(AFFILIATE_LINKS_PATH).parent.mkdir(parents=True, exist_ok=True)
@@ -37,34 +87,25 @@ def main():
         logger.error(f"Topics file not found: {BESTSELLER_TOPICS_PATH}")
         return
 
-    options = uc.ChromeOptions()
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--start-maximized")
-
-    driver = uc.Chrome(options=options)
-    wait = WebDriverWait(driver, 20)
+    pool = DriverPool(
+        size=args.browsers,
+        headless=False,
+        chrome_arguments=[
+            "--disable-blink-features=AutomationControlled",
+            "--start-maximized",
+        ],
+    )
 
+    journal = None
+    corpus = PageCorpus() if args.record_pages else None
     try:
-        auth = AmazonAuthenticator(driver, wait)
-
-        # Try to load cookies first
-        if not auth.load_cookies():
-            # If cookies don't exist or are invalid, log in
-            logger.info("Need to perform login")
-            login_success = auth.login()
-            if not login_success:
-                logger.error("Login failed, cannot continue")
-                driver.save_screenshot(
-                    str(ERROR_LOG_PATH).replace(".log", "_login_failed.png")
-                )
-                return
-
-        # Add a random delay
-        time.sleep(random.uniform(2, 5))
-
-        scraper = AmazonScraper(driver, wait)
-
-        affiliate_gen = AffiliateGenerator(driver, wait)
+        # Load cookies or log in once, then share the session with all browsers
+        if not pool.start():
+            logger.error("Login failed, cannot continue")
+            get_shared_screenshot_recorder().capture(
+                pool.sessions[0].driver, "login_failed", failure=True
+            )
+            return
 
         try:
             db_manager = FirebaseManager()
@@ -75,51 +116,136 @@ def main():
 
         # Read bestseller category URLs
         with open(BESTSELLER_TOPICS_PATH, "r") as f:
-            topics = f.readlines()
+            topics = [topic.strip() for topic in f.readlines() if topic.strip()]
             logger.info(f"Loaded {len(topics)} category topics")
 
-        # Process each category
-        for topic in topics:
-            topic = topic.strip()
-            if not topic:
-                continue
+        affiliate_cache = AffiliateLinkCache()
+        dedupe_index = DedupeIndex()
+        scheduler = RefreshScheduler()
+        links_lock = threading.Lock()
+        journal = RunJournal("get_bestsellers", resume=args.resume)
 
+        def discover_category(topic):
             logger.info(f"Processing category: {topic}")
-            products = scraper.get_bestsellers(topic)
+            if journal.is_done("discovery", topic):
+                # Scraped before the interruption, replay it without a browser
+                products = [
+                    Product(**fields) for fields in journal.get("discovery", topic)
+                ]
+                logger.info(f"Resuming {len(products)} products of category {topic}")
+            else:
+                with pool.session() as session:
+                    scraper = AmazonScraper(
+                        session.driver, session.wait, corpus=corpus
+                    )
+                    products = scraper.get_bestsellers(topic)
 
-            if not products:
-                logger.warning(f"No products found for category: {topic}")
-                continue
+                if not products:
+                    logger.warning(f"No products found for category: {topic}")
+                    return None
 
-            logger.info(f"Found {len(products)} products in category {topic}")
+                journal.mark_done(
+                    "discovery",
+                    topic,
+                    [
+                        {
+                            "name": p.name,
+                            "url": p.url,
+                            "price": p.price,
+                            "rank": p.rank,
+                            "asin": p.asin,
+                        }
+                        for p in products
+                    ],
+                )
 
-            for i, product in enumerate(products):
-                try:
-                    logger.info(
-                        f"Processing product {i + 1}/{len(products)}: {product.name}"
-                    )
+            # Drop products already seen in another category or a past run
+            new_products = [
+                p
+                for p in products
+                if not journal.is_done("persistence", p.asin or p.url)
+                and dedupe_index.claim(p.asin)
+            ]
+            logger.info(
+                f"Found {len(products)} products in category {topic}, "
+                f"{len(products) - len(new_products)} duplicates dropped"
+            )
+            return new_products
+
+        def create_affiliate_link(product_url):
+            with pool.session() as session:
+                affiliate_gen = AffiliateGenerator(session.driver, session.wait)
+                return affiliate_gen.generate_affiliate_link(product_url)
 
-                    affiliate_url = affiliate_gen.generate_affiliate_link(product.url)
-                    if affiliate_url:
-                        product.affiliate_url = affiliate_url
+        def generate_affiliate_link(product):
+            logger.info(f"Processing product: {product.name}")
+            # Known links are returned from the cache without using a browser
+            affiliate_url = affiliate_cache.get_or_create(
+                product.asin,
+                lambda: create_affiliate_link(product.url),
+            )
 
-                        # Add to database if Firebase is available
-                        if db_manager:
-                            db_manager.add_product(product)
+            if not affiliate_url:
+                logger.warning(f"Failed to generate affiliate link for {product.name}")
+                return None
 
-                        with open(AFFILIATE_LINKS_PATH, "a") as file:
-                            file.write(f"{affiliate_url}\n")
-                            logger.info(f"Saved affiliate link for {product.name}")
-                    else:
-                        logger.warning(
-                            f"Failed to generate affiliate link for {product.name}"
-                        )
+            product.affiliate_url = affiliate_url
+            return [product]
 
-                    # Rate limiting with random delay
-                    time.sleep(random.uniform(2, 5))
+        def persist_product(product):
+            with links_lock, open(AFFILIATE_LINKS_PATH, "a") as file:
+                file.write(f"{product.affiliate_url}\n")
+            if product.asin:
+                scheduler.update_rank(product.asin, product.rank)
 
-                except Exception as e:
-                    logger.error(f"Error processing product {product.name}: {str(e)}")
+            def saved():
+                dedupe_index.commit(product.asin)
+                journal.mark_done("persistence", product.asin or product.url)
+
+            # Add to database if Firebase is available, recording the product
+            # as done only once its batch is written
+            if db_manager:
+                db_manager.add_products([product], on_written=saved)
+            else:
+                saved()
+            logger.info(f"Saved affiliate link for {product.name}")
+
+        pipeline = Pipeline(
+            [
+                Stage(
+                    "discovery",
+                    discover_category,
+                    concurrency=args.discovery_workers,
+                    queue_size=args.queue_size,
+                ),
+                Stage(
+                    "affiliate",
+                    generate_affiliate_link,
+                    concurrency=args.affiliate_workers,
+                    queue_size=args.queue_size,
+                ),
+                Stage(
+                    "persistence",
+                    persist_product,
+                    concurrency=args.persistence_workers,
+                    queue_size=args.queue_size,
+                ),
+            ]
+        )
+        asyncio.run(pipeline.run(topics))
+
+        if db_manager:
+            db_manager.flush()
+        scheduler.save(completed_run=False)
+        journal.complete()
+        affiliate_cache.log_stats()
+        logger.info(f"Skipped {dedupe_index.duplicates} duplicate products")
+
+        get_shared_rate_limiter().log_stats()
+
+        selector_registry = get_shared_selector_registry()
+        selector_registry.log_stats()
+        selector_registry.save()
 
         logger.info("Bestseller scraping process completed successfully")
 
@@ -127,11 +253,12 @@ def main():
         logger.error(f"Unexpected error in main process: {str(e)}")
 
     finally:
-        try:
-            driver.quit()
-            logger.info("Browser closed")
-        except:
-            logger.warning("Error while closing browser")
+        if journal:
+            journal.close()
+        if corpus:
+            corpus.close()
+        pool.close()
+        logger.info("Browser closed")
 
 
 if __name__ == "__main__":
@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 import logging
-import time
 import argparse
+from functools import partial
 from pathlib import Path
-import undetected_chromedriver as uc
-from selenium.webdriver.support.wait import WebDriverWait
 
-from config.settings import ERROR_LOG_PATH, AFFILIATE_LINKS_PATH
-from src.servant_xbot.utils.helpers import setup_chrome_driver, is_amazon_affiliate_link
+from config.settings import ERROR_LOG_PATH, AFFILIATE_LINKS_PATH, DRIVER_POOL_SIZE
+from src.servant_xbot.utils.helpers import is_amazon_affiliate_link
+from src.servant_xbot.amazon.driver_pool import DriverPool
+from src.servant_xbot.amazon.http_client import AmazonHttpClient
 from src.servant_xbot.amazon.scraper import AmazonScraper
+from src.servant_xbot.database.dedupe import DedupeIndex
 from src.servant_xbot.database.firebase import FirebaseManager
+from src.servant_xbot.utils.rate_limiter import get_shared_rate_limiter
+from src.servant_xbot.utils.selector_registry import get_shared_selector_registry
+
+
+def fetch_product_details(session, link, http_client=None):
+    """Load a product link on a pool worker.
+
+    Returns the future of the parsed product, so the worker's driver moves on
+    to the next link while this page is parsed.
+    """
+    scraper = AmazonScraper(session.driver, session.wait, http_client)
+    return scraper.submit_product_details(link)
 
 
 def main():
@@ -23,6 +36,17 @@ def main():
         default=AFFILIATE_LINKS_PATH,
         help=f"File containing Amazon links (default: {AFFILIATE_LINKS_PATH})",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DRIVER_POOL_SIZE,
+        help=f"Number of Chrome instances (default: {DRIVER_POOL_SIZE})",
+    )
+    parser.add_argument(
+        "--no-http",
+        action="store_true",
+        help="Always load product pages in the browser instead of over HTTP first",
+    )
     args = parser.parse_args()
 
     # Set up logging
@@ -39,13 +63,17 @@ def main():
         logger.error(f"File {args.file} does not exist")
         return
 
-    # Initialize Chrome driver
-    driver = setup_chrome_driver(headless=True)
-    wait = WebDriverWait(driver, 20)
+    # Initialize Chrome driver pool
+    with DriverPool(size=args.workers, headless=True) as pool:
+        if not pool.start():
+            logger.warning("Continuing without an authenticated session")
 
-    try:
-        # Initialize scraper
-        scraper = AmazonScraper(driver, wait)
+        # Shared HTTP client for the fast path, created after the pool so it
+        # is seeded with the session of the pool's login
+        http_client = (
+            None if args.no_http else AmazonHttpClient(pool.session_store)
+        )
+        fetch = partial(fetch_product_details, http_client=http_client)
 
         # Initialize Firebase manager
         db_manager = FirebaseManager()
@@ -58,33 +86,75 @@ def main():
         valid_links = [link for link in links if is_amazon_affiliate_link(link)]
         logger.info(f"Found {len(valid_links)} valid links out of {len(links)} total")
 
-        # Process each link
-        for i, link in enumerate(valid_links):
+        # Drop links to products that are already imported, resolving short
+        # links over HTTP (once, they are kept in the index) instead of
+        # opening them in the browser
+        dedupe_index = DedupeIndex()
+        resolver_client = http_client or AmazonHttpClient(pool.session_store)
+        link_asins = {}
+        try:
+            for link in valid_links:
+                asin = dedupe_index.resolve_asin(link, resolver_client.resolve_url)
+                if dedupe_index.claim(asin):
+                    link_asins[link] = asin
+        finally:
+            # Only needed for the short links under --no-http
+            if resolver_client is not http_client:
+                resolver_client.close()
+        valid_links = list(link_asins)
+        logger.info(
+            f"{len(valid_links)} links left after dropping "
+            f"{dedupe_index.duplicates} duplicates"
+        )
+
+        # Process each link as soon as a worker finishes it
+        for i, (link, pending) in enumerate(
+            pool.map(fetch, valid_links)
+        ):
             try:
-                logger.info(f"Processing link {i + 1}/{len(valid_links)}: {link}")
-
-                # Get product details
-                product = scraper.get_product_details(link)
+                product = pending.result() if pending else None
+                logger.info(f"Processed link {i + 1}/{len(valid_links)}: {link}")
 
                 if product:
                     # If this is an affiliate link, store it
                     if "amzn.to" in link:
                         product.affiliate_url = link
 
-                    # Add to database
-                    db_manager.add_product(product)
-                    logger.info(f"Added product: {product.name}")
+                    product.asin = product.asin or link_asins[link]
 
-                # Rate limiting
-                time.sleep(2)
+                    # Queue the product for the next batched write, recording
+                    # the ASIN as imported only once the batch is written
+                    db_manager.add_products(
+                        [product],
+                        on_written=partial(dedupe_index.commit, product.asin),
+                    )
+                    logger.info(f"Added product: {product.name}")
 
             except Exception as e:
                 logger.error(f"Error processing link {link}: {str(e)}")
 
-        logger.info(f"Product import completed. Processed {len(valid_links)} links.")
+        try:
+            db_manager.flush()
+        except Exception:
+            # Their ASINs were not recorded, so the next import retries them
+            logger.error("The last batch of products could not be written")
+        db_manager.cache.log_stats()
+
+        if http_client:
+            logger.info(
+                f"HTTP fast path hit rate: {http_client.fast_path_hit_rate:.1%} "
+                f"({http_client.fast_path_hits} hits, "
+                f"{http_client.fast_path_misses} browser fallbacks)"
+            )
+            http_client.close()
 
-    finally:
-        driver.quit()
+        get_shared_rate_limiter().log_stats()
+
+        selector_registry = get_shared_selector_registry()
+        selector_registry.log_stats()
+        selector_registry.save()
+
+        logger.info(f"Product import completed. Processed {len(valid_links)} links.")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,67 @@
 #!/usr/bin/env python3
 import logging
-import time
+import argparse
+from functools import partial
 from datetime import datetime
-import undetected_chromedriver as uc
-from selenium.webdriver.support.wait import WebDriverWait
 
-from config.settings import ERROR_LOG_PATH
-from src.servant_xbot.utils.helpers import setup_chrome_driver, format_brazilian_date
+from config.settings import ERROR_LOG_PATH, DRIVER_POOL_SIZE, REFRESH_PAGES_PER_HOUR
+from src.servant_xbot.utils.helpers import format_brazilian_date
+from src.servant_xbot.amazon.driver_pool import DriverPool
+from src.servant_xbot.amazon.http_client import AmazonHttpClient
 from src.servant_xbot.amazon.scraper import AmazonScraper
 from src.servant_xbot.database.firebase import FirebaseManager
+from src.servant_xbot.database.page_corpus import PageCorpus
+from src.servant_xbot.utils.rate_limiter import get_shared_rate_limiter
+from src.servant_xbot.utils.selector_registry import get_shared_selector_registry
+from src.servant_xbot.database.price_history import PriceHistory
+from src.servant_xbot.database.run_journal import RunJournal
+from src.servant_xbot.scheduler import RefreshScheduler
+
+
+def fetch_product_details(session, item, http_client=None, corpus=None):
+    """Load a stored product's page on a pool worker.
+
+    Returns the future of the parsed product, so the worker's driver moves on
+    to the next product while this page is parsed.
+    """
+    _, product = item
+    scraper = AmazonScraper(session.driver, session.wait, http_client, corpus=corpus)
+    return scraper.submit_product_details(product.url)
 
 
 def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description="Refresh stored Amazon products")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DRIVER_POOL_SIZE,
+        help=f"Number of Chrome instances (default: {DRIVER_POOL_SIZE})",
+    )
+    parser.add_argument(
+        "--no-http",
+        action="store_true",
+        help="Always load product pages in the browser instead of over HTTP first",
+    )
+    parser.add_argument(
+        "--pages-per-hour",
+        type=int,
+        default=REFRESH_PAGES_PER_HOUR,
+        help="Refresh budget; only the most overdue products are refreshed "
+        "(default: 0, refresh every product)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the products already refreshed by an interrupted run",
+    )
+    parser.add_argument(
+        "--record-pages",
+        action="store_true",
+        help="Archive the product pages for offline replay benchmarks",
+    )
+    args = parser.parse_args()
+
     # Set up logging
     logging.basicConfig(
         level=logging.INFO,
@@ -23,60 +73,179 @@ def main():
     )
     logger = logging.getLogger(__name__)
     logger.info(f"Starting product update at {format_brazilian_date()}")
-    
-    # Initialize Chrome driver
-    driver = setup_chrome_driver(headless=True)
-    wait = WebDriverWait(driver, 20)
-    
-    try:
-        # Initialize scraper
-        scraper = AmazonScraper(driver, wait)
-        
+
+    # Initialize Chrome driver pool
+    with DriverPool(size=args.workers, headless=True) as pool:
+        if not pool.start():
+            logger.warning("Continuing without an authenticated session")
+
+        # Shared HTTP client for the fast path, created after the pool so it
+        # is seeded with the session of the pool's login
+        http_client = (
+            None if args.no_http else AmazonHttpClient(pool.session_store)
+        )
+        corpus = PageCorpus() if args.record_pages else None
+        fetch = partial(fetch_product_details, http_client=http_client, corpus=corpus)
+
         # Initialize Firebase manager
         db_manager = FirebaseManager()
-        
-        # Get all products from the database
-        products = db_manager.get_all_products()
-        logger.info(f"Found {len(products)} products to update")
-        
-        # Update each product
-        for i, product in enumerate(products):
+
+        # Stream products from the database page by page
+        total = db_manager.get_last_item_index()
+        logger.info(f"Found up to {total} products to update")
+
+        # Refresh each ASIN once, even if it is stored at several indices
+        seen_asins = set()
+
+        def unique_products():
+            for index, product in db_manager.iter_products():
+                if product.asin and product.asin in seen_asins:
+                    logger.info(f"Skipping duplicate product {index}: {product.name}")
+                    continue
+                seen_asins.add(product.asin)
+                yield index, product
+
+        # Spend the refresh budget on the highest-priority products
+        scheduler = RefreshScheduler()
+        catalog = unique_products()
+        if args.pages_per_hour > 0:
+            budget = scheduler.budget(args.pages_per_hour)
+            catalog = scheduler.select(catalog, budget)
+            logger.info(f"Refreshing {len(catalog)} products (budget {budget})")
+
+        # Skip what an interrupted run already refreshed
+        journal = RunJournal("update_products", resume=args.resume)
+        catalog = (
+            (index, product)
+            for index, product in catalog
+            if not journal.is_done("refresh", scheduler.key(index, product))
+        )
+
+        # Record every observed price, including unchanged ones
+        price_history = PriceHistory()
+        price_history.start_run()
+
+        writes = 0
+        writes_avoided = 0
+
+        # Keys of refreshed products, journaled only once their update and
+        # observed price are both stored, so a resumed run redoes the rest
+        refreshed = []
+
+        def checkpoint():
+            price_history.flush()
+            for key in refreshed:
+                journal.mark_done("refresh", key)
+            refreshed.clear()
+
+        # Update each product as soon as a worker finishes it
+        results = pool.map(fetch, catalog)
+        for (index, product), pending in results:
             try:
-                logger.info(f"Processing product {i+1}/{len(products)}: {product.name}")
-                
-                # Get latest product details
-                updated_product = scraper.get_product_details(product.url)
-                
+                updated_product = pending.result() if pending else None
+                logger.info(f"Processed product {index}/{total}: {product.name}")
+                key = scheduler.key(index, product)
+                scheduler.record(
+                    key,
+                    product.price,
+                    updated_product.price if updated_product else None,
+                )
+
                 if updated_product:
                     # Keep affiliate URL if it exists
                     if product.affiliate_url:
                         updated_product.affiliate_url = product.affiliate_url
-                    
-                    # Store the previous price as last_price
-                    updated_product.last_price = product.price
-                    
-                    # Update timestamp
-                    updated_product.updated_at = datetime.now()
-                    
-                    # Update in database
-                    index = i + 1  # Assuming 1-indexed in the database
-                    db_manager.update_product(index, updated_product)
-                    
+
+                    # Keep the stored ASIN if the page did not expose one
+                    updated_product.asin = updated_product.asin or product.asin
+
+                    # Store the previous price as last_price only when it moved
+                    price_changed = product.price != updated_product.price
+                    updated_product.last_price = (
+                        product.price if price_changed else product.last_price
+                    )
+
+                    if updated_product.asin:
+                        price_history.append(
+                            updated_product.asin, updated_product.price
+                        )
+
+                    # Write only the fields that changed, or nothing at all
+                    changes = product.diff(updated_product)
+                    if changes:
+                        changes["Data"] = datetime.now().isoformat()
+                        writes += 1
+                        try:
+                            db_manager.update_product_fields(
+                                index,
+                                changes,
+                                on_written=partial(refreshed.append, key),
+                            )
+                        except Exception:
+                            # Raised by the batch write this call triggered; the
+                            # queued fields are retried by the next flush
+                            logger.error(
+                                "Batched write of product updates failed, "
+                                "retrying with the next batch"
+                            )
+                    else:
+                        writes_avoided += 1
+                        refreshed.append(key)
+
                     # Log price changes
-                    if product.price != updated_product.price:
-                        logger.info(f"Price changed for {product.name}: {product.price} -> {updated_product.price}")
-                
-                # Rate limiting
-                time.sleep(2)
-            
+                    if price_changed:
+                        logger.info(
+                            f"Price changed for {product.name}: "
+                            f"{product.price} -> {updated_product.price}"
+                        )
+
             except Exception as e:
                 logger.error(f"Error updating product {product.name}: {str(e)}")
-        
+
+            if len(refreshed) >= db_manager.batch_size:
+                checkpoint()
+
+        flushed = True
+        try:
+            db_manager.flush()
+        except Exception:
+            # Not journaled, so a resumed run refreshes them again
+            logger.error("The last batch of product updates could not be written")
+            flushed = False
+        checkpoint()
+        db_manager.cache.log_stats()
+        scheduler.save()
+        if flushed:
+            journal.complete()
+        journal.close()
+        logger.info(
+            f"{'Wrote' if flushed else 'Queued'} {writes} changed products, "
+            f"avoided {writes_avoided} writes for unchanged products"
+        )
+
+        if http_client:
+            logger.info(
+                f"HTTP fast path hit rate: {http_client.fast_path_hit_rate:.1%} "
+                f"({http_client.fast_path_hits} hits, "
+                f"{http_client.fast_path_misses} browser fallbacks)"
+            )
+            http_client.close()
+
+        if corpus:
+            logger.info(f"Page corpus holds {corpus.count()} recorded pages")
+            corpus.close()
+
+        for asin, previous_price, price in price_history.biggest_drops():
+            logger.info(f"Price drop for {asin}: {previous_price} -> {price}")
+
+        get_shared_rate_limiter().log_stats()
+
+        selector_registry = get_shared_selector_registry()
+        selector_registry.log_stats()
+        selector_registry.save()
+
         logger.info(f"Product update completed at {format_brazilian_date()}")
-    
-    finally:
-        driver.quit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,6 +1,5 @@
 import logging
 import time
-import random
 from typing import Optional
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
@@ -11,22 +10,68 @@ from selenium.webdriver.support.expected_conditions import (
 )
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from config.settings import ERROR_LOG_PATH
+from .readiness import wait_for_sitestripe
+from ..utils.helpers import drain_transferred_bytes, extract_asin
+from ..utils.rate_limiter import RateLimiter, get_shared_rate_limiter
+from ..utils.screenshots import ScreenshotRecorder, get_shared_screenshot_recorder
+from ..utils.selector_registry import (
+    SelectorRegistry,
+    get_shared_selector_registry,
+)
 
 logger = logging.getLogger(__name__)
 handler = logging.FileHandler(ERROR_LOG_PATH)
 logger.addHandler(handler)
 
+# Seconds to wait for a selector other than the learned favourite
+FALLBACK_SELECTOR_TIMEOUT = 2
+
+# Fallback selectors, tried in the order learned by the selector registry
+AFFILIATE_BUTTON_SELECTORS = [
+    (By.ID, "amzn-ss-get-link-button"),
+    (By.CSS_SELECTOR, "#amzn-ss-get-link"),
+    (By.XPATH, "//span[contains(text(), 'Obtenha o link')]"),
+    (By.XPATH, "//span[contains(text(), 'Get link')]"),
+    (By.CSS_SELECTOR, ".amzn-ss-wrap button"),
+]
+
+LINK_TEXTAREA_SELECTORS = [
+    (By.ID, "amzn-ss-text-shortlink-textarea"),
+    (By.CSS_SELECTOR, ".amzn-ss-text-shortlink-textarea"),
+    (By.CSS_SELECTOR, "textarea.a-text-center"),
+    (By.XPATH, "//textarea[contains(@id, 'shortlink')]"),
+]
+
 
 class AffiliateGenerator:
     """Handles generating Amazon affiliate links."""
 
-    def __init__(self, driver: uc.Chrome, wait: WebDriverWait):
+    def __init__(
+        self,
+        driver: uc.Chrome,
+        wait: WebDriverWait,
+        rate_limiter: Optional[RateLimiter] = None,
+        selectors: Optional[SelectorRegistry] = None,
+        screenshots: Optional[ScreenshotRecorder] = None,
+    ):
         self.driver = driver
         self.wait = wait
-
-    def _random_sleep(self, min_sec=1, max_sec=3):
-        """Sleep for a random time between min_sec and max_sec."""
-        time.sleep(random.uniform(min_sec, max_sec))
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.selectors = selectors or get_shared_selector_registry()
+        self.screenshots = screenshots or get_shared_screenshot_recorder()
+        self.last_page_load_seconds = 0.0
+        self.last_page_bytes: Optional[int] = None
+
+    def _wait(self, attempt_number: int) -> WebDriverWait:
+        """Get the wait for the n-th selector tried.
+
+        The SiteStripe bar is already mounted when the selectors are tried, so
+        only the learned favourite gets the full timeout and a miss of any
+        fallback costs a couple of seconds.
+        """
+        if attempt_number == 0:
+            return self.wait
+        return WebDriverWait(self.driver, FALLBACK_SELECTOR_TIMEOUT)
 
     def generate_affiliate_link(self, product_url: str) -> Optional[str]:
         """Generate an affiliate link for a product URL.
@@ -39,25 +84,32 @@ class AffiliateGenerator:
         """
         try:
             logger.info(f"Generating affiliate link for {product_url}")
+            # Screenshots are named after the product they show
+            asin = extract_asin(product_url) or "unknown"
 
             # Navigate to the product page
+            self.rate_limiter.acquire()
+            drain_transferred_bytes(self.driver)
+            start = time.monotonic()
             self.driver.get(product_url)
-            self._random_sleep(2, 4)
-
-            # Attempt to find the affiliate link button with multiple selectors
-            affiliate_button_selectors = [
-                (By.ID, "amzn-ss-get-link-button"),
-                (By.CSS_SELECTOR, "#amzn-ss-get-link"),
-                (By.XPATH, "//span[contains(text(), 'Obtenha o link')]"),
-                (By.XPATH, "//span[contains(text(), 'Get link')]"),
-                (By.CSS_SELECTOR, ".amzn-ss-wrap button"),
-            ]
-
-            # Try each selector
-            for by, selector in affiliate_button_selectors:
+            wait_for_sitestripe(self.driver)
+            self.last_page_load_seconds = time.monotonic() - start
+            self.last_page_bytes = drain_transferred_bytes(self.driver)
+
+            # Try each selector, the one that worked most recently first
+            button_selectors = self.selectors.ordered(
+                "affiliate.button", AFFILIATE_BUTTON_SELECTORS
+            )
+            for attempt_number, (by, selector) in enumerate(button_selectors):
                 try:
                     logger.info(f"Looking for affiliate button with {by}: {selector}")
-                    button = self.wait.until(element_to_be_clickable((by, selector)))
+                    with self.selectors.attempt(
+                        "affiliate.button", (by, selector)
+                    ) as attempt:
+                        button = self._wait(attempt_number).until(
+                            element_to_be_clickable((by, selector))
+                        )
+                        attempt.hit = True
                     button.click()
                     logger.info(f"Clicked affiliate button using {by}: {selector}")
                     break
@@ -65,52 +117,57 @@ class AffiliateGenerator:
                     continue
             else:
                 logger.error("Could not find affiliate button")
-                self.driver.save_screenshot(
-                    str(ERROR_LOG_PATH).replace(
-                        ".log",
-                        f"_affiliate_button_error_{product_url.split('/')[-2]}.png",
-                    )
+                self.rate_limiter.record_failure("missing affiliate button")
+                self.screenshots.capture(
+                    self.driver,
+                    f"affiliate_button_error_{asin}",
+                    failure=True,
                 )
                 return None
 
-            self._random_sleep(1, 3)
-
             # Take screenshot
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(
-                    ".log", f"_after_affiliate_click_{product_url.split('/')[-2]}.png"
-                )
-            )
+            self.screenshots.capture(self.driver, f"after_affiliate_click_{asin}")
 
             # Try to find the text area with the generated link
-            link_textarea_selectors = [
-                (By.ID, "amzn-ss-text-shortlink-textarea"),
-                (By.CSS_SELECTOR, ".amzn-ss-text-shortlink-textarea"),
-                (By.CSS_SELECTOR, "textarea.a-text-center"),
-                (By.XPATH, "//textarea[contains(@id, 'shortlink')]"),
-            ]
-
-            # Try each selector
-            for by, selector in link_textarea_selectors:
+            textarea_selectors = self.selectors.ordered(
+                "affiliate.textarea", LINK_TEXTAREA_SELECTORS
+            )
+            for attempt_number, (by, selector) in enumerate(textarea_selectors):
                 try:
                     logger.info(f"Looking for link textarea with {by}: {selector}")
-                    textarea = self.wait.until(
-                        presence_of_element_located((by, selector))
+                    with self.selectors.attempt(
+                        "affiliate.textarea", (by, selector)
+                    ) as attempt:
+                        textarea = self._wait(attempt_number).until(
+                            presence_of_element_located((by, selector))
+                        )
+                        attempt.hit = True
+                    # The short link is filled in asynchronously after the click
+                    affiliate_link = self.wait.until(
+                        lambda _: textarea.text or textarea.get_attribute("value")
                     )
-                    self._random_sleep(0.5, 1.5)
-                    affiliate_link = textarea.text or textarea.get_attribute("value")
 
                     if affiliate_link:
-                        logger.info(f"Found affiliate link: {affiliate_link}")
+                        logger.info(
+                            f"Found affiliate link: {affiliate_link}, page ready "
+                            f"in {self.last_page_load_seconds:.2f}s"
+                            + (
+                                f", {self.last_page_bytes / 1024:.0f} KB transferred"
+                                if self.last_page_bytes is not None
+                                else ""
+                            )
+                        )
+                        self.rate_limiter.record_success()
                         return affiliate_link
                 except (TimeoutException, NoSuchElementException):
                     continue
 
             logger.error("Could not find affiliate link textarea")
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(
-                    ".log", f"_affiliate_link_error_{product_url.split('/')[-2]}.png"
-                )
+            self.rate_limiter.record_failure("missing affiliate link textarea")
+            self.screenshots.capture(
+                self.driver,
+                f"affiliate_link_error_{asin}",
+                failure=True,
             )
             return None
 
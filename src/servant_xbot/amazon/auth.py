@@ -1,8 +1,7 @@
-import pickle
 import logging
 import time
 import random
-from typing import Optional
+from typing import List, Optional
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -12,8 +11,11 @@ from selenium.webdriver.support.expected_conditions import (
     element_to_be_clickable,
 )
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from config.settings import AMAZON_EMAIL, AMAZON_PASSWORD, COOKIES_PATH, ERROR_LOG_PATH
+from config.settings import AMAZON_EMAIL, AMAZON_PASSWORD, ERROR_LOG_PATH
 from dotenv import load_dotenv
+from ..database.session_store import SESSION_COOKIE_NAMES, SessionStore
+from ..utils.rate_limiter import RateLimiter, get_shared_rate_limiter
+from ..utils.screenshots import ScreenshotRecorder, get_shared_screenshot_recorder
 
 load_dotenv()
 
@@ -25,9 +27,19 @@ logger.addHandler(handler)
 class AmazonAuthenticator:
     """Handles Amazon authentication and cookie management."""
 
-    def __init__(self, driver: uc.Chrome, wait: WebDriverWait):
+    def __init__(
+        self,
+        driver: uc.Chrome,
+        wait: WebDriverWait,
+        rate_limiter: Optional[RateLimiter] = None,
+        screenshots: Optional[ScreenshotRecorder] = None,
+        session_store: Optional[SessionStore] = None,
+    ):
         self.driver = driver
         self.wait = wait
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.screenshots = screenshots or get_shared_screenshot_recorder()
+        self.session_store = session_store or SessionStore()
 
     def _human_like_typing(self, element, text):
         """Type text in a human-like way with random delays."""
@@ -69,16 +81,14 @@ class AmazonAuthenticator:
                 return False
 
             # Navigate directly to the login page
+            self.rate_limiter.acquire()
             self.driver.get(
                 "https://www.amazon.com.br/ap/signin?openid.pape.max_auth_age=0&openid.return_to=https%3A%2F%2Fwww.amazon.com.br%2F%3Fref_%3Dnav_signin&openid.identity=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.assoc_handle=brflex&openid.mode=checkid_setup&openid.claimed_id=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0%2Fidentifier_select&openid.ns=http%3A%2F%2Fspecs.openid.net%2Fauth%2F2.0"
             )
             self._random_sleep(2, 4)
 
             # Take screenshot of the login page for debugging
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(".log", "_login_page.png")
-            )
-            logger.info("Saved login page screenshot")
+            self.screenshots.capture(self.driver, "login_page")
 
             # Look for email field - try different selectors
             email_selectors = [
@@ -100,9 +110,7 @@ class AmazonAuthenticator:
 
             if not email_input:
                 logger.error("Could not find email input field")
-                self.driver.save_screenshot(
-                    str(ERROR_LOG_PATH).replace(".log", "_login_error.png")
-                )
+                self.screenshots.capture(self.driver, "login_error", failure=True)
                 return False
 
             # Enter email in a human-like way
@@ -139,9 +147,7 @@ class AmazonAuthenticator:
             self._random_sleep(2, 4)
 
             # Take screenshot of password page for debugging
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(".log", "_password_page.png")
-            )
+            self.screenshots.capture(self.driver, "password_page")
 
             # Look for password field
             password_selectors = [
@@ -162,9 +168,7 @@ class AmazonAuthenticator:
 
             if not password_input:
                 logger.error("Could not find password input field")
-                self.driver.save_screenshot(
-                    str(ERROR_LOG_PATH).replace(".log", "_password_error.png")
-                )
+                self.screenshots.capture(self.driver, "password_error", failure=True)
                 return False
 
             # Enter password in a human-like way
@@ -203,9 +207,7 @@ class AmazonAuthenticator:
             self._random_sleep(5, 10)
 
             # Take screenshot after login attempt
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(".log", "_after_login.png")
-            )
+            self.screenshots.capture(self.driver, "after_login")
 
             # Check for successful login by looking for account indicators
             success_indicators = [
@@ -222,55 +224,80 @@ class AmazonAuthenticator:
                     logger.info(f"Login verified by presence of {by}: {selector}")
 
                     # Save cookies
-                    self._save_cookies()
+                    self.save_session()
                     return True
                 except (TimeoutException, NoSuchElementException):
                     continue
 
             logger.error("Login verification failed")
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(".log", "_verification_error.png")
-            )
+            self.screenshots.capture(self.driver, "verification_error", failure=True)
             return False
 
         except Exception as e:
             logger.error(f"Error during login process: {str(e)}")
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(".log", "_exception_error.png")
-            )
+            self.screenshots.capture(self.driver, "exception_error", failure=True)
             return False
 
-    def _save_cookies(self) -> None:
-        """Save browser cookies to file."""
+    def _browser_cookies(self) -> List[dict]:
+        """Read every cookie of the browser, whatever page it is on."""
+        return self.driver.execute_cdp_cmd("Network.getAllCookies", {}).get(
+            "cookies", []
+        )
+
+    def save_session(self) -> None:
+        """Save the browser's Amazon cookies to the session store."""
         try:
-            with open(COOKIES_PATH, "wb") as file:
-                pickle.dump(self.driver.get_cookies(), file)
-            logger.info(f"Cookies saved to {COOKIES_PATH}")
+            self.session_store.save(self._browser_cookies())
+            logger.info(f"Session saved to {self.session_store.path}")
         except Exception as e:
-            logger.error(f"Error saving cookies: {str(e)}")
+            logger.error(f"Error saving session: {str(e)}")
+
+    def has_session(self) -> bool:
+        """Check for a signed-in session without loading any page.
+
+        Reads the browser's cookie jar through CDP, which works before the
+        first navigation, so a persistent profile that is still signed in
+        skips the cookie replay and the login entirely.
+
+        Returns:
+            bool: True if an unexpired authentication cookie is present
+        """
+        try:
+            cookies = self._browser_cookies()
+        except Exception as e:
+            logger.warning(f"Could not read the browser cookies: {str(e)}")
+            return False
+
+        now = time.time()
+        for cookie in cookies:
+            if (
+                cookie.get("name") in SESSION_COOKIE_NAMES
+                and cookie.get("domain", "").endswith("amazon.com.br")
+                and (cookie.get("session") or cookie.get("expires", 0) > now)
+            ):
+                logger.info("Browser profile already has a signed-in session")
+                return True
+        return False
 
     def load_cookies(self) -> bool:
-        """Load cookies from file and add them to the driver.
+        """Load the stored session into the driver and verify it.
+
+        The cookies are set through CDP before the first navigation, so a
+        single page load is enough to verify them. A session that expires
+        within the refresh margin is not loaded, so the caller logs in again
+        before it lapses.
 
         Returns:
             bool: True if cookies were loaded successfully, False otherwise
         """
-        # First visit the domain
-        self.driver.get("https://www.amazon.com.br/")
-        self._random_sleep(2, 4)
+        if self.session_store.needs_refresh():
+            logger.info("Stored session is missing or about to expire")
+            return False
 
         try:
-            with open(COOKIES_PATH, "rb") as file:
-                cookies = pickle.load(file)
-                for cookie in cookies:
-                    try:
-                        self.driver.add_cookie(cookie)
-                    except Exception as e:
-                        logger.warning(f"Could not add cookie: {str(e)}")
-
-            # Refresh page after loading cookies
-            self.driver.refresh()
-            self._random_sleep(2, 4)
+            loaded = self.session_store.apply_to_driver(self.driver)
+            self.rate_limiter.acquire()
+            self.driver.get("https://www.amazon.com.br/")
 
             # Verify cookies worked by checking for login state
             for by, selector in [
@@ -279,16 +306,14 @@ class AmazonAuthenticator:
             ]:
                 try:
                     self.wait.until(presence_of_element_located((by, selector)))
-                    logger.info("Cookies loaded and logged in successfully")
+                    logger.info(f"Loaded {loaded} cookies and logged in successfully")
+                    self.session_store.mark_validated()
                     return True
                 except (TimeoutException, NoSuchElementException):
                     continue
 
             logger.warning("Cookies loaded but login state not verified")
             return False
-        except (FileNotFoundError, EOFError) as e:
-            logger.warning(f"Could not load cookies: {str(e)}")
-            return False
         except Exception as e:
             logger.error(f"Error loading cookies: {str(e)}")
             return False
@@ -0,0 +1,266 @@
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+import undetected_chromedriver as uc
+from selenium.webdriver.support.wait import WebDriverWait
+from config.settings import (
+    BROWSER_LEAN_PROFILE,
+    BROWSER_PERSISTENT_PROFILE,
+    BROWSER_PROFILES_DIR,
+    DRIVER_POOL_SIZE,
+    ERROR_LOG_PATH,
+)
+from .auth import AmazonAuthenticator
+from ..database.session_store import SessionStore
+from ..utils.helpers import setup_chrome_driver
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+_WORKER_DONE = object()
+
+
+@dataclass
+class DriverSession:
+    """A Chrome driver together with its wait helper."""
+
+    driver: uc.Chrome
+    wait: WebDriverWait
+
+
+class DriverPool:
+    """Runs several Chrome drivers sharing one authenticated session.
+
+    Each driver can keep a persistent Chrome profile, one directory per
+    worker, so a session that is still signed in is reused without loading
+    any page. Otherwise the first driver loads the stored session (or logs
+    in) and the others are seeded from the session store, so the pool costs a
+    single login. Work is distributed through a queue; the request rate of
+    all workers is bounded by the shared rate limiter used by the scrapers.
+    """
+
+    def __init__(
+        self,
+        size: int = DRIVER_POOL_SIZE,
+        headless: bool = True,
+        authenticate: bool = True,
+        wait_timeout: int = 20,
+        chrome_arguments: Optional[List[str]] = None,
+        lean: bool = BROWSER_LEAN_PROFILE,
+        persistent_profile: bool = BROWSER_PERSISTENT_PROFILE,
+        profiles_dir: Path = BROWSER_PROFILES_DIR,
+        session_store: Optional[SessionStore] = None,
+    ):
+        """Initialize the pool without starting any browser.
+
+        Args:
+            size (int): Number of Chrome instances
+            headless (bool): Whether to run Chrome in headless mode
+            authenticate (bool): Whether to log the drivers into Amazon
+            wait_timeout (int): Timeout of each driver's WebDriverWait
+            chrome_arguments (List[str], optional): Extra Chrome arguments
+            lean (bool): Start the browsers with the resource-blocking profile
+            persistent_profile (bool): Keep each worker's Chrome profile
+                between runs instead of starting from a temporary one
+            profiles_dir (Path): Directory holding the persistent profiles
+            session_store (SessionStore, optional): Session shared by the
+                drivers, and by HTTP clients seeded after ``start``
+        """
+        self.size = max(1, size)
+        self.headless = headless
+        self.authenticate = authenticate
+        self.wait_timeout = wait_timeout
+        self.chrome_arguments = chrome_arguments
+        self.lean = lean
+        self.persistent_profile = persistent_profile
+        self.profiles_dir = Path(profiles_dir)
+        self.session_store = session_store or SessionStore()
+        self.sessions: List[DriverSession] = []
+        self._idle: "queue.Queue[DriverSession]" = queue.Queue()
+        self._started_at: Optional[float] = None
+        self._first_scrape_lock = threading.Lock()
+
+    def _create_session(self, index: int) -> DriverSession:
+        # Chrome locks its profile, so every worker needs a directory of its own
+        user_data_dir = (
+            self.profiles_dir / f"worker-{index}" if self.persistent_profile else None
+        )
+        driver = setup_chrome_driver(
+            headless=self.headless,
+            arguments=self.chrome_arguments,
+            lean=self.lean,
+            user_data_dir=user_data_dir,
+        )
+        wait = WebDriverWait(driver, self.wait_timeout)
+        return DriverSession(driver=driver, wait=wait)
+
+    def start(self) -> bool:
+        """Start the Chrome instances and share the authenticated session.
+
+        Drivers are started one after the other because undetected-chromedriver
+        patches its binary on startup.
+
+        Returns:
+            bool: True if the drivers are authenticated (or authentication was
+            not requested), False otherwise
+        """
+        self._started_at = time.monotonic()
+        authenticated = not self.authenticate
+        reused = 0
+
+        for i in range(self.size):
+            session = self._create_session(i)
+            self.sessions.append(session)
+            self._idle.put(session)
+
+            if not self.authenticate:
+                continue
+
+            auth = AmazonAuthenticator(
+                session.driver, session.wait, session_store=self.session_store
+            )
+            if self.persistent_profile and auth.has_session():
+                if i == 0:
+                    # Keep the store in step with the profile's renewed cookies
+                    auth.save_session()
+                if not self.session_store.needs_refresh():
+                    reused += 1
+                    authenticated = authenticated or i == 0
+                    continue
+                logger.info("Session is about to expire, renewing it")
+
+            if i == 0:
+                authenticated = auth.load_cookies() or auth.login()
+                if not authenticated:
+                    logger.warning("Driver pool could not authenticate")
+            elif authenticated:
+                self.session_store.apply_to_driver(session.driver)
+
+        logger.info(
+            f"Driver pool started with {len(self.sessions)} drivers in "
+            f"{time.monotonic() - self._started_at:.1f}s, "
+            f"{reused} signed-in profiles reused"
+        )
+        return authenticated
+
+    def _record_first_scrape(self) -> None:
+        """Log the time from startup to the first finished piece of work."""
+        with self._first_scrape_lock:
+            if self._started_at is None:
+                return
+            logger.info(
+                f"Time to first scrape: {time.monotonic() - self._started_at:.1f}s"
+            )
+            self._started_at = None
+
+    @contextmanager
+    def session(self) -> Iterator[DriverSession]:
+        """Borrow an idle driver session for the duration of the block."""
+        session = self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+            self._record_first_scrape()
+
+    def map(
+        self, fn: Callable[[DriverSession, Any], Any], items: Iterable[Any]
+    ) -> Iterator[Tuple[Any, Any]]:
+        """Process items on all drivers in parallel.
+
+        Items are read lazily from ``items`` into a bounded work queue, so a
+        streamed catalog is never fully loaded in memory. Results are yielded
+        in completion order on the calling thread. If the caller stops
+        iterating early, workers finish their current item and exit.
+
+        Args:
+            fn (Callable[[DriverSession, Any], Any]): Called once per item with
+                the worker's session; exceptions are logged and give None
+            items (Iterable[Any]): Work items
+
+        Yields:
+            Tuple[Any, Any]: Item and the value returned by ``fn``
+        """
+        if not self.sessions:
+            raise RuntimeError("Driver pool has not been started")
+
+        work: queue.Queue = queue.Queue(maxsize=len(self.sessions) * 2)
+        results: queue.Queue = queue.Queue()
+        stop = threading.Event()
+
+        def feed() -> None:
+            try:
+                for item in items:
+                    while not stop.is_set():
+                        try:
+                            work.put(item, timeout=0.5)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        break
+            except Exception as e:
+                logger.error(f"Error reading work items: {str(e)}")
+            finally:
+                for _ in self.sessions:
+                    work.put(_WORKER_DONE)
+
+        def work_loop() -> None:
+            with self.session() as session:
+                while True:
+                    item = work.get()
+                    if item is _WORKER_DONE:
+                        break
+                    if stop.is_set():
+                        continue
+                    try:
+                        result = fn(session, item)
+                    except Exception as e:
+                        logger.error(f"Error processing {item}: {str(e)}")
+                        result = None
+                    results.put((item, result))
+            results.put(_WORKER_DONE)
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        threads.extend(
+            threading.Thread(target=work_loop, daemon=True) for _ in self.sessions
+        )
+        for thread in threads:
+            thread.start()
+
+        try:
+            running = len(self.sessions)
+            while running:
+                result = results.get()
+                if result is _WORKER_DONE:
+                    running -= 1
+                    continue
+                self._record_first_scrape()
+                yield result
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def close(self) -> None:
+        """Quit every driver in the pool."""
+        for session in self.sessions:
+            try:
+                session.driver.quit()
+            except Exception as e:
+                logger.warning(f"Error while closing browser: {str(e)}")
+        self.sessions = []
+        self._idle = queue.Queue()
+
+    def __enter__(self) -> "DriverPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
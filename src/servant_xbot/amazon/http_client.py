@@ -0,0 +1,127 @@
+import logging
+import threading
+from typing import Optional
+import httpx
+from config.settings import ERROR_LOG_PATH
+from ..database.session_store import SessionStore
+from ..utils.rate_limiter import RateLimiter, get_shared_rate_limiter
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+
+class AmazonHttpClient:
+    """Fetches Amazon pages over pooled keep-alive HTTP connections.
+
+    The client is thread-safe and meant to be shared by every scraper of a
+    run. It also keeps the fast-path statistics of those scrapers.
+    """
+
+    def __init__(
+        self,
+        session_store: Optional[SessionStore] = None,
+        timeout: float = 15.0,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """Create the HTTP client and seed it with the stored Amazon session.
+
+        Args:
+            session_store (SessionStore, optional): Session to reuse, e.g. the
+                one of a started driver pool
+            timeout (float): Request timeout in seconds
+            rate_limiter (RateLimiter, optional): Paces the short link
+                requests, defaults to the limiter shared by the process
+        """
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.client = httpx.Client(
+            http2=True,
+            headers=DEFAULT_HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        self.fast_path_hits = 0
+        self.fast_path_misses = 0
+        self._stats_lock = threading.Lock()
+        self.seed(session_store or SessionStore())
+
+    def seed(self, session_store: SessionStore) -> None:
+        """Load the live cookies of a session store into the client."""
+        loaded = session_store.apply_to_http_client(self.client)
+        if loaded:
+            logger.info(f"Loaded {loaded} cookies into the HTTP client")
+        else:
+            logger.warning("No stored session to load into the HTTP client")
+
+    def get(self, url: str) -> Optional[httpx.Response]:
+        """Fetch a page.
+
+        Args:
+            url (str): Page URL
+
+        Returns:
+            Optional[httpx.Response]: Response or None if the request failed
+        """
+        try:
+            return self.client.get(url)
+        except httpx.HTTPError as e:
+            logger.warning(f"HTTP request to {url} failed: {str(e)}")
+            return None
+
+    def resolve_url(self, url: str) -> Optional[str]:
+        """Follow the redirects of a URL, e.g. an ``amzn.to`` short link.
+
+        Args:
+            url (str): URL to resolve
+
+        Returns:
+            Optional[str]: Final URL or None if the request failed
+        """
+        self.rate_limiter.acquire()
+        try:
+            response = self.client.head(url)
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not resolve {url}: {str(e)}")
+            self.rate_limiter.record_failure("short link request error")
+            return None
+
+        if response.status_code == 503:
+            self.rate_limiter.record_failure("HTTP 503")
+        else:
+            self.rate_limiter.record_success()
+        return str(response.url)
+
+    def record_fast_path(self, hit: bool) -> None:
+        """Record whether a page was served by the HTTP fast path."""
+        with self._stats_lock:
+            if hit:
+                self.fast_path_hits += 1
+            else:
+                self.fast_path_misses += 1
+
+    @property
+    def fast_path_hit_rate(self) -> float:
+        """Share of pages served without falling back to the browser."""
+        total = self.fast_path_hits + self.fast_path_misses
+        return self.fast_path_hits / total if total else 0.0
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.client.close()
+
+    def __enter__(self) -> "AmazonHttpClient":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
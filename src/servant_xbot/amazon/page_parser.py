@@ -0,0 +1,274 @@
+import atexit
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+from config.settings import (
+    ERROR_LOG_PATH,
+    PARSER_BACKEND,
+    PARSER_PROCESSES,
+    PARSER_RESTRICT_SUBTREES,
+)
+from ..utils.prices import parse_price
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+# Elements holding the title, price and ASIN of a product page. Restricted
+# parses only build these subtrees instead of the whole multi-megabyte page.
+PRODUCT_SUBTREE_IDS = [
+    "title",
+    "productTitle",
+    "corePrice_feature_div",
+    "corePriceDisplay_desktop_feature_div",
+    "corePrice_desktop",
+    "apex_desktop",
+    "buybox",
+    "price_inside_buybox",
+    "priceblock_ourprice",
+    "ASIN",
+]
+
+# Page type, selector, hit and seconds of a selector attempt
+Attempt = Tuple[str, str, bool, float]
+
+
+def available_backends() -> List[str]:
+    """Installed parser backends, fastest first."""
+    return [
+        backend
+        for backend, installed in zip(
+            BACKENDS, (LexborHTMLParser is not None, HAS_LXML, True)
+        )
+        if installed
+    ]
+
+
+def resolve_backend(backend: str = PARSER_BACKEND) -> str:
+    """Pick the parser backend to use.
+
+    Args:
+        backend (str): ``selectolax``, ``lxml``, ``html.parser`` or ``auto``
+            for the fastest one installed
+
+    Returns:
+        str: An installed backend; unavailable ones fall back to ``html.parser``
+    """
+    if backend == "auto":
+        return available_backends()[0]
+    if backend == "selectolax" and LexborHTMLParser is None:
+        logger.warning("selectolax is not installed, using html.parser")
+        return "html.parser"
+    if backend == "lxml" and not HAS_LXML:
+        logger.warning("lxml is not installed, using html.parser")
+        return "html.parser"
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown parser backend {backend}, using html.parser")
+        return "html.parser"
+    return backend
+
+
+@dataclass
+class ParsedProductPage:
+    """Fields read from a product page, with the selector attempts made.
+
+    Parsing may run in another process, where the selector registry is not
+    available, so attempts are returned for the caller to record.
+    """
+
+    name: Optional[str] = None
+    price: Optional[float] = None
+    asin: Optional[str] = None
+    attempts: List[Attempt] = field(default_factory=list)
+
+
+def parse_product_page(
+    html_body: str,
+    price_selectors: Sequence[str],
+    name_selectors: Sequence[str],
+    backend: str = "html.parser",
+    restrict: bool = False,
+) -> ParsedProductPage:
+    """Read the name, price and ASIN of a product page.
+
+    Selectors are tried in the given order until one matches. A module-level
+    function, so it can run in a worker process.
+
+    Args:
+        html_body (str): Page HTML
+        price_selectors (Sequence[str]): CSS selectors of the price
+        name_selectors (Sequence[str]): CSS selectors of the product name
+        backend (str): Resolved parser backend
+        restrict (bool): Only parse the title and buybox subtrees; ignored by
+            selectolax, which parses the whole page faster than that
+
+    Returns:
+        ParsedProductPage: Fields found, None for the missing ones
+    """
+    if backend == "selectolax":
+        tree = LexborHTMLParser(html_body)
+
+        def select_text(selector: str) -> Optional[str]:
+            node = tree.css_first(selector)
+            return node.text() if node is not None else None
+
+        asin_node = tree.css_first("input#ASIN")
+        asin = asin_node.attributes.get("value") if asin_node is not None else None
+    else:
+        soup = BeautifulSoup(
+            html_body,
+            "lxml" if backend == "lxml" else "html.parser",
+            parse_only=SoupStrainer(id=PRODUCT_SUBTREE_IDS) if restrict else None,
+        )
+
+        def select_text(selector: str) -> Optional[str]:
+            element = soup.select_one(selector)
+            return element.text if element is not None else None
+
+        asin_element = soup.select_one("input#ASIN")
+        asin = asin_element.get("value") if asin_element else None
+
+    parsed = ParsedProductPage(asin=asin)
+
+    for selector in price_selectors:
+        start = time.monotonic()
+        try:
+            text = select_text(selector)
+            parsed.price = parse_price(text)
+        except Exception:
+            parsed.price = None
+        hit = parsed.price is not None
+        parsed.attempts.append(
+            ("product.price", selector, hit, time.monotonic() - start)
+        )
+        if hit:
+            break
+
+    for selector in name_selectors:
+        start = time.monotonic()
+        try:
+            text = select_text(selector)
+        except Exception:
+            text = None
+        hit = text is not None
+        parsed.attempts.append(
+            ("product.name", selector, hit, time.monotonic() - start)
+        )
+        if hit:
+            parsed.name = text.strip()
+            break
+
+    return parsed
+
+
+class PageParser:
+    """Parses product pages with a configurable backend, off the driver thread.
+
+    With worker processes, parsing a page no longer holds the GIL of the
+    process driving the browsers, and ``submit`` returns at once, so a driver
+    can navigate to its next URL while the previous page is parsed.
+    """
+
+    def __init__(
+        self,
+        backend: str = PARSER_BACKEND,
+        restrict: bool = PARSER_RESTRICT_SUBTREES,
+        processes: int = PARSER_PROCESSES,
+    ):
+        """Initialize the parser.
+
+        Args:
+            backend (str): Parser backend, see ``resolve_backend``
+            restrict (bool): Only parse the title and buybox subtrees
+            processes (int): Worker processes, 0 parses on the calling thread
+        """
+        self.backend = resolve_backend(backend)
+        self.restrict = restrict
+        self._executor = None
+        if processes > 0:
+            # Spawned, not forked: the scraping process runs browser and
+            # database threads that a fork would copy mid-operation
+            self._executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def submit(
+        self,
+        html_body: str,
+        price_selectors: Sequence[str],
+        name_selectors: Sequence[str],
+    ) -> "Future[ParsedProductPage]":
+        """Parse a product page in the background.
+
+        Returns:
+            Future[ParsedProductPage]: Already done when parsing inline
+        """
+        if self._executor:
+            return self._executor.submit(
+                parse_product_page,
+                html_body,
+                list(price_selectors),
+                list(name_selectors),
+                self.backend,
+                self.restrict,
+            )
+
+        future: Future = Future()
+        try:
+            future.set_result(
+                parse_product_page(
+                    html_body,
+                    price_selectors,
+                    name_selectors,
+                    self.backend,
+                    self.restrict,
+                )
+            )
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_shared_parser: Optional[PageParser] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_page_parser() -> PageParser:
+    """Get the page parser shared by every scraper of the process."""
+    global _shared_parser
+    with _shared_lock:
+        if _shared_parser is None:
+            _shared_parser = PageParser()
+            atexit.register(_shared_parser.close)
+            logger.info(
+                f"Parsing product pages with {_shared_parser.backend}"
+                + (" (restricted)" if _shared_parser.restrict else "")
+            )
+        return _shared_parser
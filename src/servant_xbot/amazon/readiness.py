@@ -0,0 +1,138 @@
+import logging
+import time
+from typing import Optional
+import undetected_chromedriver as uc
+from selenium.webdriver.support.wait import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from config.settings import ERROR_LOG_PATH, PAGE_READY_TIMEOUT
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+POLL_FREQUENCY = 0.1
+
+# A captcha page never gets the content we wait for, so it counts as ready
+# and is left for the caller to detect.
+CAPTCHA_SELECTOR = "form[action*='validateCaptcha']"
+
+PRODUCT_READY_SCRIPT = """
+const captcha = document.querySelector(arguments[0]);
+const title = document.querySelector("#productTitle, .product-title-word-break");
+const price = document.querySelector(
+    ".a-price .a-offscreen, #corePrice_feature_div, #price_inside_buybox, "
+    + "#priceblock_ourprice, #outOfStock, #availability"
+);
+return Boolean(captcha || (title && (price || document.readyState === "complete")));
+"""
+
+BESTSELLER_COUNT_SCRIPT = """
+if (document.querySelector(arguments[0])) return -1;
+return document.querySelectorAll(
+    "#gridItemRoot, [id^='p13n-asin-index'], .zg-item-immersion"
+).length;
+"""
+
+SITESTRIPE_READY_SCRIPT = """
+return Boolean(
+    document.querySelector(arguments[0])
+    || document.querySelector("#amzn-ss-wrap, #amzn-ss-get-link-button")
+);
+"""
+
+
+class _CountStabilized:
+    """Wait condition met once a count is positive and stops changing."""
+
+    def __init__(self, stable_for: float):
+        self.stable_for = stable_for
+        self.count = None
+        self.since = 0.0
+
+    def __call__(self, driver: uc.Chrome) -> bool:
+        count = driver.execute_script(BESTSELLER_COUNT_SCRIPT, CAPTCHA_SELECTOR)
+        if count < 0:
+            return True
+
+        now = time.monotonic()
+        if count != self.count:
+            self.count = count
+            self.since = now
+            return False
+        return count > 0 and now - self.since >= self.stable_for
+
+
+def _wait(driver: uc.Chrome, condition, timeout: float, page: str) -> Optional[float]:
+    """Poll a condition, returning the seconds it took or None on timeout."""
+    start = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+    except TimeoutException:
+        logger.warning(f"{page} not ready after {timeout:.0f}s")
+        return None
+    except WebDriverException as e:
+        logger.warning(f"Error waiting for {page}: {str(e)}")
+        return None
+    return time.monotonic() - start
+
+
+def wait_for_product_page(
+    driver: uc.Chrome, timeout: float = PAGE_READY_TIMEOUT
+) -> Optional[float]:
+    """Wait until the product title and a price or availability node exist.
+
+    Args:
+        driver (uc.Chrome): Driver that just navigated to a product page
+        timeout (float): Seconds to wait at most
+
+    Returns:
+        Optional[float]: Seconds until the page was ready, None on timeout
+    """
+    return _wait(
+        driver,
+        lambda d: d.execute_script(PRODUCT_READY_SCRIPT, CAPTCHA_SELECTOR),
+        timeout,
+        "Product page",
+    )
+
+
+def wait_for_bestseller_grid(
+    driver: uc.Chrome,
+    timeout: float = PAGE_READY_TIMEOUT,
+    stable_for: float = 0.5,
+) -> Optional[float]:
+    """Wait until the bestseller grid has cards and their count stops growing.
+
+    The grid renders its cards in batches and lazily appends more on scroll,
+    so it is only complete once the count has held for ``stable_for``.
+
+    Args:
+        driver (uc.Chrome): Driver showing a bestseller page
+        timeout (float): Seconds to wait at most
+        stable_for (float): Seconds the card count must hold
+
+    Returns:
+        Optional[float]: Seconds until the grid was stable, None on timeout
+    """
+    return _wait(driver, _CountStabilized(stable_for), timeout, "Bestseller grid")
+
+
+def wait_for_sitestripe(
+    driver: uc.Chrome, timeout: float = PAGE_READY_TIMEOUT
+) -> Optional[float]:
+    """Wait until the SiteStripe affiliate bar is mounted.
+
+    Args:
+        driver (uc.Chrome): Driver that just navigated to a product page
+        timeout (float): Seconds to wait at most
+
+    Returns:
+        Optional[float]: Seconds until the bar was mounted, None on timeout
+    """
+    return _wait(
+        driver,
+        lambda d: d.execute_script(SITESTRIPE_READY_SCRIPT, CAPTCHA_SELECTOR),
+        timeout,
+        "SiteStripe bar",
+    )
@@ -0,0 +1,137 @@
+import hashlib
+import html
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+import undetected_chromedriver as uc
+from selenium.common.exceptions import WebDriverException
+from config.settings import ERROR_LOG_PATH
+from ..database.page_corpus import PageCorpus
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+
+@dataclass
+class ReplayResponse:
+    """The parts of an ``httpx.Response`` used by the scraper."""
+
+    status_code: int
+    text: str
+
+
+class ReplayHttpClient:
+    """Serves recorded pages in place of ``AmazonHttpClient``.
+
+    Passed as the scraper's HTTP client, it sends product pages through the
+    same fast-path parsing code as a live run, without any network access.
+    """
+
+    def __init__(self, corpus: PageCorpus):
+        self.corpus = corpus
+        self.fast_path_hits = 0
+        self.fast_path_misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[ReplayResponse]:
+        """Get a recorded page, as a 404 if it was never recorded."""
+        html_body = self.corpus.get(url)
+        if html_body is None:
+            return ReplayResponse(status_code=404, text="")
+        return ReplayResponse(status_code=200, text=html_body)
+
+    def record_fast_path(self, hit: bool) -> None:
+        """Record whether a page was parsed successfully."""
+        with self._stats_lock:
+            if hit:
+                self.fast_path_hits += 1
+            else:
+                self.fast_path_misses += 1
+
+    @property
+    def fast_path_hit_rate(self) -> float:
+        """Share of pages parsed without a browser fallback."""
+        total = self.fast_path_hits + self.fast_path_misses
+        return self.fast_path_hits / total if total else 0.0
+
+    def close(self) -> None:
+        pass
+
+
+class ReplayDriver:
+    """Wraps a real driver so ``get`` loads recorded pages from disk.
+
+    Pages are written to a temporary directory and opened over ``file://``
+    with a ``<base>`` pointing at their original URL, so relative links
+    resolve as they did live. The browser is switched to offline mode, so
+    subresources fail fast instead of reaching Amazon. Every other attribute
+    is the wrapped driver's, so scripts, selectors and readiness waits run
+    unchanged.
+    """
+
+    def __init__(self, driver: uc.Chrome, corpus: PageCorpus):
+        """Wrap a driver.
+
+        Args:
+            driver (uc.Chrome): Driver used to render the recorded pages
+            corpus (PageCorpus): Recorded pages
+        """
+        self._driver = driver
+        self._corpus = corpus
+        self._directory = Path(tempfile.mkdtemp(prefix="servant_xbot_replay_"))
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd(
+                "Network.emulateNetworkConditions",
+                {
+                    "offline": True,
+                    "latency": 0,
+                    "downloadThroughput": -1,
+                    "uploadThroughput": -1,
+                },
+            )
+        except Exception as e:
+            logger.warning(f"Could not switch the replay browser offline: {str(e)}")
+
+    def get(self, url: str) -> None:
+        """Load the recorded version of a URL.
+
+        Raises:
+            WebDriverException: If the URL was never recorded
+        """
+        html_body = self._corpus.get(url)
+        if html_body is None:
+            raise WebDriverException(f"Page not recorded: {url}")
+
+        base = f'<base href="{html.escape(url, quote=True)}">'
+        if "<head>" in html_body:
+            html_body = html_body.replace("<head>", f"<head>{base}", 1)
+        else:
+            html_body = base + html_body
+
+        path = self._directory / f"{hashlib.sha1(url.encode()).hexdigest()}.html"
+        path.write_text(html_body, encoding="utf-8")
+        self._driver.get(path.as_uri())
+
+    # Every command, including the ones of elements and of ``get`` above, runs
+    # through the wrapped driver's ``execute``. Replacing it here replaces it
+    # there, so ``count_webdriver_calls`` counts replayed round-trips too.
+    @property
+    def execute(self) -> Callable:
+        return self._driver.execute
+
+    @execute.setter
+    def execute(self, execute: Callable) -> None:
+        self._driver.execute = execute
+
+    @execute.deleter
+    def execute(self) -> None:
+        del self._driver.execute
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._driver, name)
@@ -1,24 +1,35 @@
-import re
+import json
+import math
 import logging
 import time
-import random
-from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
+from concurrent.futures import Future
+from typing import List, Optional
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support.expected_conditions import (
-    presence_of_all_elements_located,
-    presence_of_element_located,
-)
 from selenium.common.exceptions import (
-    TimeoutException,
     NoSuchElementException,
     WebDriverException,
     StaleElementReferenceException,
 )
 from config.settings import ERROR_LOG_PATH
+from .http_client import AmazonHttpClient
+from .page_parser import PageParser, ParsedProductPage, get_shared_page_parser
+from .readiness import wait_for_bestseller_grid, wait_for_product_page
+from ..database.page_corpus import BESTSELLER_PAGE, PRODUCT_PAGE, PageCorpus
 from ..models.product import Product
+from ..utils.helpers import (
+    canonicalize_product_url,
+    count_webdriver_calls,
+    drain_transferred_bytes,
+)
+from ..utils.prices import parse_prices
+from ..utils.rate_limiter import RateLimiter, get_shared_rate_limiter
+from ..utils.screenshots import ScreenshotRecorder, get_shared_screenshot_recorder
+from ..utils.selector_registry import (
+    SelectorRegistry,
+    get_shared_selector_registry,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -26,167 +37,212 @@ handler = logging.FileHandler(ERROR_LOG_PATH)
 logger.addHandler(handler)
 
 
+# Extracts every bestseller card in a single round-trip. Name, price and link
+# are read from the same card, so they can never be paired with the fields of
+# a neighbouring product.
+BESTSELLER_EXTRACTION_SCRIPT = """
+const cardSelectors = [
+    "#gridItemRoot",
+    "[id^='p13n-asin-index']",
+    ".zg-grid-general-faceout",
+    ".zg-item-immersion",
+];
+const nameSelectors = [
+    "._cDEzb_p13n-sc-css-line-clamp-3_g3dy1",
+    ".p13n-sc-truncate-desktop-type2",
+    ".p13n-sc-truncate",
+    ".a-link-normal .a-size-base",
+    ".a-text-normal",
+];
+const priceSelectors = [
+    "._cDEzb_p13n-sc-price_3mJ9Z",
+    ".p13n-sc-price",
+    ".a-price .a-offscreen",
+    ".a-color-price",
+    ".a-price-whole",
+];
+
+let cards = [];
+for (const selector of cardSelectors) {
+    cards = Array.from(document.querySelectorAll(selector));
+    if (cards.length) break;
+}
+
+const firstText = (card, selectors) => {
+    for (const selector of selectors) {
+        const element = card.querySelector(selector);
+        const text = element && (element.innerText || element.textContent || "").trim();
+        if (text) return text;
+    }
+    return "";
+};
+
+return JSON.stringify(cards.map((card, index) => {
+    const link = card.querySelector("a[href*='/dp/']");
+    const badge = card.querySelector(".zg-bdg-text");
+    const rank = badge ? parseInt(badge.textContent.replace(/\\D/g, ""), 10) : NaN;
+    return {
+        name: firstText(card, nameSelectors),
+        price: firstText(card, priceSelectors),
+        href: link ? link.href : "",
+        rank: Number.isNaN(rank) ? index + 1 : rank,
+    };
+}));
+"""
+
+
+BOT_CHECK_MARKERS = (
+    "/errors/validatecaptcha",
+    "captchacharacters",
+    "api-services-support@amazon.com",
+    "digite os caracteres que você vê",
+    "type the characters you see",
+)
+
+
+def is_bot_check_page(html_body: str) -> bool:
+    """Check if a page is Amazon's captcha/robot check instead of content."""
+    lowered = html_body.lower()
+    return any(marker in lowered for marker in BOT_CHECK_MARKERS)
+
+
+# Fallback selectors, tried in the order learned by the selector registry
+PRODUCT_NAME_SELECTORS = [
+    (By.CLASS_NAME, "_cDEzb_p13n-sc-css-line-clamp-3_g3dy1"),
+    (By.CSS_SELECTOR, ".a-link-normal .a-size-base"),
+    (By.CSS_SELECTOR, "[id^='p13n-asin-index'] .p13n-sc-truncate"),
+    (By.XPATH, "//div[contains(@class, 'p13n-sc-truncate')]"),
+    (By.CSS_SELECTOR, ".zg-grid-general-faceout .p13n-sc-truncate-desktop-type2"),
+    (By.CSS_SELECTOR, ".zg-item-immersion .a-text-normal"),
+    (By.CSS_SELECTOR, ".p13n-sc-truncate-desktop-type2"),
+    (By.CSS_SELECTOR, ".p13n-sc-truncate"),
+]
+
+PRODUCT_PRICE_SELECTORS = [
+    (By.CLASS_NAME, "_cDEzb_p13n-sc-price_3mJ9Z"),
+    (By.CSS_SELECTOR, ".a-price-whole"),
+    (By.CSS_SELECTOR, ".p13n-sc-price"),
+    (By.CSS_SELECTOR, ".a-color-price"),
+    (By.XPATH, "//span[contains(@class, 'p13n-sc-price')]"),
+    (By.CSS_SELECTOR, ".zg-item-immersion .a-color-price"),
+    (By.CSS_SELECTOR, ".a-price .a-offscreen"),
+]
+
+PRODUCT_LINK_SELECTORS = [
+    (By.CSS_SELECTOR, "a.a-link-normal.aok-block"),
+    (By.CSS_SELECTOR, "a.a-link-normal"),
+    (By.CSS_SELECTOR, ".zg-item-immersion a"),
+    (By.CSS_SELECTOR, ".a-link-normal[title]"),
+    (By.XPATH, "//a[contains(@class, 'a-link-normal') and contains(@href, '/dp/')]"),
+]
+
+PRICE_SELECTORS = [
+    "span.a-offscreen",
+    "span.a-price span.a-offscreen",
+    "#price_inside_buybox",
+    "#priceblock_ourprice",
+    ".a-price .a-offscreen",
+]
+
+NAME_SELECTORS = [
+    "#productTitle",
+    ".product-title-word-break",
+    ".a-size-large.product-title-word-break",
+]
+
+
 class AmazonScraper:
     """Handles scraping product information from Amazon."""
 
-    def __init__(self, driver: uc.Chrome, wait: WebDriverWait):
+    def __init__(
+        self,
+        driver: uc.Chrome,
+        wait: WebDriverWait,
+        http_client: Optional[AmazonHttpClient] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        selectors: Optional[SelectorRegistry] = None,
+        screenshots: Optional[ScreenshotRecorder] = None,
+        corpus: Optional[PageCorpus] = None,
+        parser: Optional[PageParser] = None,
+    ):
         self.driver = driver
         self.wait = wait
+        self.http_client = http_client
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter()
+        self.selectors = selectors or get_shared_selector_registry()
+        self.screenshots = screenshots or get_shared_screenshot_recorder()
+        # Fetched pages are archived here for offline replay, when given
+        self.corpus = corpus
+        self.parser = parser or get_shared_page_parser()
+        self.last_page_webdriver_calls = 0
+        self.last_page_load_seconds = 0.0
+        self.last_page_bytes: Optional[int] = None
 
-    def _random_sleep(self, min_sec=1, max_sec=3):
-        """Sleep for a random time between min_sec and max_sec."""
-        time.sleep(random.uniform(min_sec, max_sec))
+    def _page_bytes_suffix(self) -> str:
+        """Describe the traffic of the last page, if the driver records it."""
+        if self.last_page_bytes is None:
+            return ""
+        return f", {self.last_page_bytes / 1024:.0f} KB transferred"
 
-    def get_bestsellers(self, category_url: str) -> List[Product]:
-        """Get bestseller products from a category URL."""
-        products = []
+    def get_bestsellers(self, category_url: str, bulk: bool = True) -> List[Product]:
+        """Get bestseller products from a category URL.
+
+        Args:
+            category_url (str): URL of the bestseller category page
+            bulk (bool): Extract all product cards with a single script call
+                instead of walking the selector lists element by element.
+                Falls back to the selector lists when no card is found.
 
+        Returns:
+            List[Product]: Products found on the page
+        """
         try:
             logger.info(f"Fetching bestsellers from {category_url}")
 
-            # Navigate to the category page
-            self.driver.get(category_url.strip())
-            self._random_sleep(3, 5)
+            with count_webdriver_calls(self.driver) as counter:
+                # Navigate to the category page
+                self.rate_limiter.acquire()
+                drain_transferred_bytes(self.driver)
+                start = time.monotonic()
+                self.driver.get(category_url.strip())
+                wait_for_bestseller_grid(self.driver)
 
-            # Take screenshot for debugging
-            self.driver.save_screenshot(
-                str(ERROR_LOG_PATH).replace(
-                    ".log", f"_category_{category_url.split('/')[-2]}.png"
-                )
-            )
-
-            # Scroll to load more products with human-like behavior
-            for _ in range(3):
+                # Scroll to the bottom so the lazily loaded cards are appended
                 self.driver.execute_script(
-                    f"window.scrollBy(0, {random.randint(300, 700)});"
+                    "window.scrollTo(0, document.body.scrollHeight);"
                 )
-                self._random_sleep(0.5, 2)
-
-            # Look for product elements with different possible selectors
-            product_name_selectors = [
-                (By.CLASS_NAME, "_cDEzb_p13n-sc-css-line-clamp-3_g3dy1"),
-                (By.CSS_SELECTOR, ".a-link-normal .a-size-base"),
-                (By.CSS_SELECTOR, "[id^='p13n-asin-index'] .p13n-sc-truncate"),
-                (By.XPATH, "//div[contains(@class, 'p13n-sc-truncate')]"),
-                (
-                    By.CSS_SELECTOR,
-                    ".zg-grid-general-faceout .p13n-sc-truncate-desktop-type2",
-                ),
-                (By.CSS_SELECTOR, ".zg-item-immersion .a-text-normal"),
-                (By.CSS_SELECTOR, ".p13n-sc-truncate-desktop-type2"),
-                (By.CSS_SELECTOR, ".p13n-sc-truncate"),
-            ]
-
-            product_price_selectors = [
-                (By.CLASS_NAME, "_cDEzb_p13n-sc-price_3mJ9Z"),
-                (By.CSS_SELECTOR, ".a-price-whole"),
-                (By.CSS_SELECTOR, ".p13n-sc-price"),
-                (By.CSS_SELECTOR, ".a-color-price"),
-                (By.XPATH, "//span[contains(@class, 'p13n-sc-price')]"),
-                (By.CSS_SELECTOR, ".zg-item-immersion .a-color-price"),
-                (By.CSS_SELECTOR, ".a-price .a-offscreen"),
-            ]
-
-            product_link_selectors = [
-                (By.CSS_SELECTOR, "a.a-link-normal.aok-block"),
-                (By.CSS_SELECTOR, "a.a-link-normal"),
-                (By.CSS_SELECTOR, ".zg-item-immersion a"),
-                (By.CSS_SELECTOR, ".a-link-normal[title]"),
-                (
-                    By.XPATH,
-                    "//a[contains(@class, 'a-link-normal') and contains(@href, '/dp/')]",
-                ),
-            ]
-
-            # Try each selector for product names
-            product_names = []
-            for by, selector in product_name_selectors:
-                try:
-                    elements = self.driver.find_elements(by, selector)
-                    if elements:
-                        product_names = [
-                            element.text.strip()
-                            for element in elements
-                            if element.text.strip()
-                        ]
-                        logger.info(
-                            f"Found {len(product_names)} product names using {by}: {selector}"
-                        )
-                        break
-                except (NoSuchElementException, StaleElementReferenceException):
-                    continue
-
-            # Try each selector for product prices
-            product_prices = []
-            for by, selector in product_price_selectors:
-                try:
-                    elements = self.driver.find_elements(by, selector)
-                    if elements:
-                        price_texts = [
-                            element.text.strip()
-                            for element in elements
-                            if element.text.strip()
-                        ]
-                        product_prices = []
-                        for price_text in price_texts:
-                            try:
-                                # Try to extract price with various formats
-                                price_match = re.search(r"R\$\s*([\d.,]+)", price_text)
-                                if price_match:
-                                    price_str = (
-                                        price_match.group(1)
-                                        .replace(".", "")
-                                        .replace(",", ".")
-                                    )
-                                    product_prices.append(float(price_str))
-                            except (ValueError, AttributeError):
-                                continue
-                        if product_prices:
-                            logger.info(
-                                f"Found {len(product_prices)} product prices using {by}: {selector}"
-                            )
-                            break
-                except (NoSuchElementException, StaleElementReferenceException):
-                    continue
-
-            # Try each selector for product URLs
-            product_urls = []
-            for by, selector in product_link_selectors:
-                try:
-                    elements = self.driver.find_elements(by, selector)
-                    if elements:
-                        product_urls = [
-                            element.get_attribute("href")
-                            for element in elements
-                            if element.get_attribute("href")
-                            and "dp/" in element.get_attribute("href")
-                        ]
-                        logger.info(
-                            f"Found {len(product_urls)} product URLs using {by}: {selector}"
-                        )
-                        break
-                except (NoSuchElementException, StaleElementReferenceException):
-                    continue
-
-            # Log what we found for debugging
-            logger.info(f"Product names count: {len(product_names)}")
-            logger.info(f"Product prices count: {len(product_prices)}")
-            logger.info(f"Product URLs count: {len(product_urls)}")
-
-            # Create Product objects from the smallest list length to avoid index errors
-            max_products = min(
-                len(product_names), len(product_prices), len(product_urls)
-            )
-            for i in range(max_products):
-                products.append(
-                    Product(
-                        name=product_names[i],
-                        url=product_urls[i],
-                        price=product_prices[i],
+                wait_for_bestseller_grid(self.driver)
+                self.last_page_load_seconds = time.monotonic() - start
+                self.last_page_bytes = drain_transferred_bytes(self.driver)
+                if self.corpus:
+                    self.corpus.record(
+                        category_url.strip(), self.driver.page_source, BESTSELLER_PAGE
                     )
+
+                products = self._extract_bestsellers_bulk() if bulk else []
+                if not products:
+                    if bulk:
+                        logger.info("Bulk extraction found nothing, using selectors")
+                    products = self._extract_bestsellers_by_selectors()
+
+                # Take screenshot for debugging
+                self.screenshots.capture(
+                    self.driver,
+                    f"category_{category_url.split('/')[-2]}",
+                    failure=not products,
                 )
 
-            logger.info(f"Successfully created {len(products)} product objects")
+            self.last_page_webdriver_calls = counter.calls
+            if products:
+                self.rate_limiter.record_success()
+            else:
+                self.rate_limiter.record_failure("empty bestseller page")
+            logger.info(
+                f"Successfully created {len(products)} product objects "
+                f"using {counter.calls} WebDriver calls, "
+                f"page ready in {self.last_page_load_seconds:.2f}s"
+                + self._page_bytes_suffix()
+            )
             return products
 
         except WebDriverException as e:
@@ -194,84 +250,267 @@ class AmazonScraper:
                 f"WebDriver error scraping bestsellers from {category_url}: {str(e)}"
             )
             # Take screenshot for debugging
-            try:
-                self.driver.save_screenshot(
-                    str(ERROR_LOG_PATH).replace(
-                        ".log", f"_error_category_{category_url.split('/')[-2]}.png"
-                    )
-                )
-            except:
-                pass
+            self.screenshots.capture(
+                self.driver,
+                f"error_category_{category_url.split('/')[-2]}",
+                failure=True,
+            )
             return []
         except Exception as e:
             logger.error(f"Error scraping bestsellers from {category_url}: {str(e)}")
+            self.screenshots.capture(
+                self.driver,
+                f"error_category_{category_url.split('/')[-2]}",
+                failure=True,
+            )
+            return []
+
+    def _extract_bestsellers_bulk(self) -> List[Product]:
+        """Extract every product card on the current page in one script call."""
+        cards = json.loads(self.driver.execute_script(BESTSELLER_EXTRACTION_SCRIPT))
+        logger.info(f"Found {len(cards)} product cards using bulk extraction")
+
+        products = []
+        prices = parse_prices(card["price"] for card in cards).tolist()
+        for card, price in zip(cards, prices):
+            if not (card["name"] and card["href"]) or math.isnan(price):
+                continue
+            products.append(
+                Product(
+                    name=card["name"],
+                    url=canonicalize_product_url(card["href"]) or card["href"],
+                    price=price,
+                    rank=card["rank"],
+                )
+            )
+        return products
+
+    def _extract_bestsellers_by_selectors(self) -> List[Product]:
+        """Extract products by walking the name, price and link selector lists."""
+        # Try each selector for product names
+        product_names = []
+        for by, selector in self.selectors.ordered(
+            "bestseller.name", PRODUCT_NAME_SELECTORS
+        ):
             try:
-                self.driver.save_screenshot(
-                    str(ERROR_LOG_PATH).replace(
-                        ".log", f"_error_category_{category_url.split('/')[-2]}.png"
+                with self.selectors.attempt(
+                    "bestseller.name", (by, selector)
+                ) as attempt:
+                    elements = self.driver.find_elements(by, selector)
+                    product_names = [
+                        element.text.strip()
+                        for element in elements
+                        if element.text.strip()
+                    ]
+                    attempt.hit = bool(product_names)
+                if product_names:
+                    logger.info(
+                        f"Found {len(product_names)} product names using {by}: {selector}"
+                    )
+                    break
+            except (NoSuchElementException, StaleElementReferenceException):
+                continue
+
+        # Try each selector for product prices
+        product_prices = []
+        for by, selector in self.selectors.ordered(
+            "bestseller.price", PRODUCT_PRICE_SELECTORS
+        ):
+            try:
+                with self.selectors.attempt(
+                    "bestseller.price", (by, selector)
+                ) as attempt:
+                    elements = self.driver.find_elements(by, selector)
+                    price_texts = [
+                        element.text.strip()
+                        for element in elements
+                        if element.text.strip()
+                    ]
+                    product_prices = [
+                        price
+                        # The whole-part span holds the amount without "R$"
+                        for price in parse_prices(
+                            price_texts, bare=selector == ".a-price-whole"
+                        ).tolist()
+                        if not math.isnan(price)
+                    ]
+                    attempt.hit = bool(product_prices)
+                if product_prices:
+                    logger.info(
+                        f"Found {len(product_prices)} product prices using {by}: {selector}"
                     )
+                    break
+            except (NoSuchElementException, StaleElementReferenceException):
+                continue
+
+        # Try each selector for product URLs
+        product_urls = []
+        for by, selector in self.selectors.ordered(
+            "bestseller.link", PRODUCT_LINK_SELECTORS
+        ):
+            try:
+                with self.selectors.attempt(
+                    "bestseller.link", (by, selector)
+                ) as attempt:
+                    elements = self.driver.find_elements(by, selector)
+                    product_urls = [
+                        element.get_attribute("href")
+                        for element in elements
+                        if element.get_attribute("href")
+                        and "dp/" in element.get_attribute("href")
+                    ]
+                    attempt.hit = bool(product_urls)
+                if product_urls:
+                    logger.info(
+                        f"Found {len(product_urls)} product URLs using {by}: {selector}"
+                    )
+                    break
+            except (NoSuchElementException, StaleElementReferenceException):
+                continue
+
+        # Log what we found for debugging
+        logger.info(f"Product names count: {len(product_names)}")
+        logger.info(f"Product prices count: {len(product_prices)}")
+        logger.info(f"Product URLs count: {len(product_urls)}")
+
+        # Create Product objects from the smallest list length to avoid index errors
+        products = []
+        max_products = min(len(product_names), len(product_prices), len(product_urls))
+        for i in range(max_products):
+            product_url = product_urls[i]
+            products.append(
+                Product(
+                    name=product_names[i],
+                    url=canonicalize_product_url(product_url) or product_url,
+                    price=product_prices[i],
+                    rank=i + 1,
                 )
-            except:
-                pass
-            return []
+            )
+        return products
 
     def get_product_details(self, url: str) -> Optional[Product]:
-        """Get detailed product information from a product URL."""
+        """Get detailed product information from a product URL.
+
+        When the scraper has an HTTP client, the page is fetched and parsed
+        without the browser first. The browser is only used when that request
+        fails, returns a bot-check page, or the title/price selectors miss.
+        """
+        return self.submit_product_details(url).result()
+
+    def submit_product_details(self, url: str) -> "Future[Optional[Product]]":
+        """Load a product page and parse it in the background.
+
+        Same as ``get_product_details``, except that a page loaded in the
+        browser is handed to the page parser and the driver is free again as
+        soon as this returns, while the page is still being parsed.
+
+        Returns:
+            Future[Optional[Product]]: The product, None if it was not found
+        """
+        if self.http_client:
+            product = self._get_product_details_http(url)
+            self.http_client.record_fast_path(product is not None)
+            if product:
+                return _done(product)
+            logger.info(f"HTTP fast path missed for {url}, using the browser")
+
         try:
             logger.info(f"Fetching product details from {url}")
+            self.rate_limiter.acquire()
+            drain_transferred_bytes(self.driver)
+            start = time.monotonic()
             self.driver.get(url)
-            self._random_sleep(2, 4)
+            wait_for_product_page(self.driver)
+            self.last_page_load_seconds = time.monotonic() - start
+            self.last_page_bytes = drain_transferred_bytes(self.driver)
+            logger.info(
+                f"Product page ready in {self.last_page_load_seconds:.2f}s"
+                + self._page_bytes_suffix()
+            )
 
             html_body = self.driver.page_source
-            soup = BeautifulSoup(html_body, "html.parser")
-
-            # Try multiple selectors for the price
-            price = None
-            price_selectors = [
-                "span.a-offscreen",
-                "span.a-price span.a-offscreen",
-                "#price_inside_buybox",
-                "#priceblock_ourprice",
-                ".a-price .a-offscreen",
-            ]
-
-            for selector in price_selectors:
-                price_element = soup.select_one(selector)
-                if price_element:
-                    price_text = price_element.text.strip()
-                    price_match = re.search(r"R\$\s*([\d.,]+)", price_text)
-                    if price_match:
-                        price_str = (
-                            price_match.group(1).replace(".", "").replace(",", ".")
-                        )
-                        try:
-                            price = float(price_str)
-                            break
-                        except ValueError:
-                            continue
-
-            # Try multiple selectors for the product name
-            name = None
-            name_selectors = [
-                "#productTitle",
-                ".product-title-word-break",
-                ".a-size-large.product-title-word-break",
-            ]
-
-            for selector in name_selectors:
-                name_element = soup.select_one(selector)
-                if name_element:
-                    name = name_element.text.strip()
-                    break
+            if is_bot_check_page(html_body):
+                self.rate_limiter.record_failure("captcha page")
+                return _done(None)
+            if self.corpus:
+                self.corpus.record(url, html_body, PRODUCT_PAGE)
 
-            if name and price:
-                return Product(name=name, url=url, price=price)
-            else:
-                logger.warning(
-                    f"Could not extract complete product information from {url}"
-                )
-                return None
+            return self._submit_parse(html_body, url)
 
         except Exception as e:
             logger.error(f"Error getting product details from {url}: {str(e)}")
+            return _done(None)
+
+    def _get_product_details_http(self, url: str) -> Optional[Product]:
+        """Fetch and parse a product page without the browser."""
+        try:
+            self.rate_limiter.acquire()
+            response = self.http_client.get(url)
+            if response is None:
+                return None
+            if response.status_code == 503:
+                self.rate_limiter.record_failure("HTTP 503")
+                return None
+            if response.status_code != 200:
+                return None
+            if is_bot_check_page(response.text):
+                logger.warning(f"Bot-check page returned for {url}")
+                self.rate_limiter.record_failure("captcha page")
+                return None
+            if self.corpus:
+                self.corpus.record(url, response.text, PRODUCT_PAGE)
+
+            return self._submit_parse(response.text, url).result()
+        except Exception as e:
+            logger.error(f"Error fetching {url} over HTTP: {str(e)}")
             return None
+
+    def _submit_parse(self, html_body: str, url: str) -> "Future[Optional[Product]]":
+        """Parse a product page on the page parser and build its product.
+
+        The selectors are ordered by this process's registry, and the
+        attempts made by the parser are recorded back into it, so the
+        statistics stay in one place when parsing runs in worker processes.
+        """
+        parse_future = self.parser.submit(
+            html_body,
+            self.selectors.ordered("product.price", PRICE_SELECTORS),
+            self.selectors.ordered("product.name", NAME_SELECTORS),
+        )
+        future: Future = Future()
+
+        def finish(parse_future: "Future[ParsedProductPage]") -> None:
+            try:
+                parsed = parse_future.result()
+                for page_type, selector, hit, latency in parsed.attempts:
+                    self.selectors.record(page_type, selector, hit, latency)
+
+                product = None
+                if parsed.name and parsed.price:
+                    product = Product(
+                        name=parsed.name,
+                        url=url,
+                        price=parsed.price,
+                        # Short links carry no ASIN, so take it from the page
+                        asin=parsed.asin,
+                    )
+                    self.rate_limiter.record_success()
+                else:
+                    self.rate_limiter.record_failure("empty product selectors")
+                    logger.warning(
+                        f"Could not extract complete product information from {url}"
+                    )
+                future.set_result(product)
+            except Exception as e:
+                logger.error(f"Error parsing product page {url}: {str(e)}")
+                future.set_result(None)
+
+        parse_future.add_done_callback(finish)
+        return future
+
+
+def _done(product: Optional[Product]) -> "Future[Optional[Product]]":
+    """Wrap an already known result in a completed future."""
+    future: Future = Future()
+    future.set_result(product)
+    return future
@@ -0,0 +1,127 @@
+import sqlite3
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from config.settings import (
+    AFFILIATE_CACHE_PATH,
+    AFFILIATE_CACHE_TTL_DAYS,
+    ERROR_LOG_PATH,
+)
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+
+class AffiliateLinkCache:
+    """Persistent ASIN-keyed cache of generated affiliate short links."""
+
+    def __init__(
+        self,
+        path: Path = AFFILIATE_CACHE_PATH,
+        ttl_days: float = AFFILIATE_CACHE_TTL_DAYS,
+    ):
+        """Open (or create) the cache database.
+
+        Args:
+            path (Path): SQLite database file
+            ttl_days (float): Age after which a link is regenerated, 0 keeps
+                links forever
+        """
+        self.ttl = ttl_days * 86400 if ttl_days > 0 else None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS affiliate_links ("
+            "asin TEXT PRIMARY KEY, link TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, asin: str) -> Tuple[Optional[str], bool]:
+        """Look up the cached link of an ASIN.
+
+        Args:
+            asin (str): Product ASIN
+
+        Returns:
+            Tuple[Optional[str], bool]: Cached link (or None) and whether it
+            is still within the TTL
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT link, created_at FROM affiliate_links WHERE asin = ?",
+                (asin,),
+            ).fetchone()
+
+        if not row:
+            return None, False
+
+        link, created_at = row
+        fresh = self.ttl is None or time.time() - created_at < self.ttl
+        return link, fresh
+
+    def set(self, asin: str, link: str) -> None:
+        """Store the link of an ASIN, replacing any previous one."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO affiliate_links (asin, link, created_at) "
+                "VALUES (?, ?, ?)",
+                (asin, link, time.time()),
+            )
+            self._conn.commit()
+
+    def get_or_create(
+        self, asin: Optional[str], create: Callable[[], Optional[str]]
+    ) -> Optional[str]:
+        """Return the cached link of an ASIN, generating it on a miss.
+
+        Expired links are regenerated; if that fails the expired link is
+        returned rather than nothing.
+
+        Args:
+            asin (Optional[str]): Product ASIN, None bypasses the cache
+            create (Callable[[], Optional[str]]): Generates a new link
+
+        Returns:
+            Optional[str]: Affiliate link or None if none could be generated
+        """
+        if not asin:
+            return create()
+
+        link, fresh = self.get(asin)
+        with self._lock:
+            if link and fresh:
+                self.hits += 1
+            elif link:
+                self.revalidations += 1
+            else:
+                self.misses += 1
+
+        if link and fresh:
+            return link
+
+        new_link = create()
+        if new_link:
+            self.set(asin, new_link)
+            return new_link
+
+        if link:
+            logger.warning(f"Could not revalidate link of {asin}, using cached link")
+        return link
+
+    def log_stats(self) -> None:
+        """Log the hit and miss counters of the run."""
+        logger.info(
+            f"Affiliate link cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.revalidations} revalidations"
+        )
+
+    def close(self) -> None:
+        """Close the cache database."""
+        self._conn.close()
@@ -0,0 +1,127 @@
+import sqlite3
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Set
+from config.settings import DEDUPE_INDEX_PATH, ERROR_LOG_PATH
+from ..utils.helpers import extract_asin, is_short_link
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+
+class DedupeIndex:
+    """Tracks which ASINs were already handled, in this run and in past runs.
+
+    ASINs claimed during the run are kept in memory; ``commit`` persists an
+    ASIN once its work is done, so later runs skip it too. Resolved short
+    links are persisted as well, so each ``amzn.to`` link is only followed
+    once.
+    """
+
+    def __init__(self, path: Path = DEDUPE_INDEX_PATH):
+        """Open (or create) the dedupe index database.
+
+        Args:
+            path (Path): SQLite database file
+        """
+        self.duplicates = 0
+        self._claimed: Set[str] = set()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_asins ("
+            "asin TEXT PRIMARY KEY, seen_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS short_links ("
+            "url TEXT PRIMARY KEY, asin TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def claim(self, asin: Optional[str], persisted: bool = True) -> bool:
+        """Claim an ASIN for processing.
+
+        Args:
+            asin (Optional[str]): Product ASIN, None is always accepted
+            persisted (bool): Also reject ASINs committed by previous runs
+
+        Returns:
+            bool: True if the ASIN should be processed, False if it is a
+            duplicate
+        """
+        if not asin:
+            return True
+
+        with self._lock:
+            duplicate = asin in self._claimed
+            if not duplicate and persisted:
+                duplicate = (
+                    self._conn.execute(
+                        "SELECT 1 FROM seen_asins WHERE asin = ?", (asin,)
+                    ).fetchone()
+                    is not None
+                )
+
+            if duplicate:
+                self.duplicates += 1
+                return False
+
+            self._claimed.add(asin)
+            return True
+
+    def commit(self, asin: Optional[str]) -> None:
+        """Persist an ASIN whose work has been completed."""
+        if not asin:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO seen_asins (asin, seen_at) VALUES (?, ?)",
+                (asin, time.time()),
+            )
+            self._conn.commit()
+
+    def resolve_asin(
+        self, url: str, resolver: Optional[Callable[[str], Optional[str]]] = None
+    ) -> Optional[str]:
+        """Get the ASIN of any product URL, following short links if needed.
+
+        Args:
+            url (str): Product URL or short link
+            resolver (Callable[[str], Optional[str]], optional): Returns the
+                final URL a short link redirects to
+
+        Returns:
+            Optional[str]: ASIN or None if it could not be determined
+        """
+        asin = extract_asin(url)
+        if asin or not is_short_link(url):
+            return asin
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT asin FROM short_links WHERE url = ?", (url,)
+            ).fetchone()
+        if row:
+            return row[0]
+
+        if resolver is None:
+            return None
+
+        asin = extract_asin(resolver(url))
+        if asin:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO short_links (url, asin) VALUES (?, ?)",
+                    (url, asin),
+                )
+                self._conn.commit()
+        return asin
+
+    def close(self) -> None:
+        """Close the index database."""
+        self._conn.close()
@@ -1,14 +1,25 @@
 import os
+import atexit
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, List, Iterable, Iterator, Tuple
 import firebase_admin
 from firebase_admin import db, credentials
 from config.settings import (
     FIREBASE_CREDENTIALS_PATH,
     FIREBASE_DATABASE_URL,
+    FIREBASE_BATCH_SIZE,
+    FIREBASE_PAGE_SIZE,
+    FIREBASE_CACHE_SIZE,
+    FIREBASE_CACHE_TTL_SECONDS,
+    FIREBASE_CACHE_LAST_ITEM_TTL_SECONDS,
+    FIREBASE_CACHE_LISTEN_PATHS,
     ERROR_LOG_PATH,
 )
 from ..models.product import Product
+from ..models.product_batch import ProductBatch
+from .read_cache import ReadCache
 
 
 logger = logging.getLogger(__name__)
@@ -19,8 +30,38 @@ logger.addHandler(handler)
 class FirebaseManager:
     """Manages Firebase database operations."""
 
-    def __init__(self):
-        """Initialize Firebase connection."""
+    def __init__(
+        self,
+        batch_size: int = FIREBASE_BATCH_SIZE,
+        cache: Optional[ReadCache] = None,
+        listen_paths: Iterable[str] = FIREBASE_CACHE_LISTEN_PATHS,
+    ):
+        """Initialize Firebase connection.
+
+        Args:
+            batch_size (int): Number of queued products that triggers a flush
+                of the pending batched writes
+            cache (ReadCache, optional): Cache of ``get_product`` and
+                ``get_last_item_index`` reads; one sized from the settings is
+                created when not given
+            listen_paths (Iterable[str]): Paths whose changes by other clients
+                invalidate the cache, see ``start_cache_listeners``
+        """
+        self.batch_size = batch_size
+        self._pending_updates: Dict[str, Any] = {}
+        self._pending_count = 0
+        self._pending_callbacks: List[Callable[[], None]] = []
+        self._next_index: Optional[int] = None
+        self._batch_lock = threading.RLock()
+        self.cache = cache or ReadCache(
+            max_entries=FIREBASE_CACHE_SIZE,
+            default_ttl=FIREBASE_CACHE_TTL_SECONDS,
+            ttls={"/last_item": FIREBASE_CACHE_LAST_ITEM_TTL_SECONDS},
+        )
+        self._listeners: List[Any] = []
+        atexit.register(self._flush_at_exit)
+        atexit.register(self.stop_cache_listeners)
+
         try:
             if not FIREBASE_CREDENTIALS_PATH.exists():
                 logger.warning(
@@ -40,6 +81,47 @@ class FirebaseManager:
             logger.error(f"Firebase initialization error: {str(e)}")
             logger.warning("Running in test mode without Firebase")
             self.test_mode = True
+            return
+
+        self.start_cache_listeners(listen_paths)
+
+    def start_cache_listeners(self, paths: Iterable[str]) -> None:
+        """Invalidate cached reads when other clients write below some paths.
+
+        Without a listener, a change made elsewhere is only seen once its
+        cached value expires. A listener downloads its whole path when it
+        starts, so listen to small paths such as ``/last_item``, or to
+        ``/items`` only when the catalog is small.
+
+        Args:
+            paths (Iterable[str]): Database paths to listen to
+        """
+        if self.test_mode:
+            return
+
+        for path in paths:
+            path = "/" + path.strip("/")
+
+            def on_change(event, path=path) -> None:
+                try:
+                    # event.path is relative to the listened path and starts with "/"
+                    self.cache.invalidate(path.rstrip("/") + event.path)
+                except Exception as e:
+                    logger.error(f"Error invalidating cache for {path}: {str(e)}")
+
+            try:
+                self._listeners.append(db.reference(path).listen(on_change))
+            except Exception as e:
+                logger.error(f"Error listening to {path}: {str(e)}")
+
+    def stop_cache_listeners(self) -> None:
+        """Close the cache listeners."""
+        listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            try:
+                listener.close()
+            except Exception as e:
+                logger.error(f"Error closing cache listener: {str(e)}")
 
     def get_last_item_index(self) -> int:
         """Get the index of the last product item."""
@@ -47,7 +129,12 @@ class FirebaseManager:
             return 0
 
         try:
-            return db.reference("/last_item").get() or 0
+            return (
+                self.cache.get_or_load(
+                    "/last_item", lambda: db.reference("/last_item").get()
+                )
+                or 0
+            )
         except Exception as e:
             logger.error(f"Error getting last item index: {str(e)}")
             return 0
@@ -59,8 +146,10 @@ class FirebaseManager:
 
         try:
             db.reference("/last_item").set(index)
+            self.cache.put("/last_item", index)
         except Exception as e:
             logger.error(f"Error updating last item index: {str(e)}")
+            self.cache.invalidate("/last_item")
 
     def add_product(self, product: Product) -> int:
         """Add a product to the database."""
@@ -74,6 +163,7 @@ class FirebaseManager:
 
             # Update product in database
             db.reference(f"/itens/{new_index}").update(product.to_dict())
+            self.cache.invalidate(f"/itens/{new_index}")
 
             # Update last item index
             self.update_last_item_index(new_index)
@@ -83,6 +173,180 @@ class FirebaseManager:
             logger.error(f"Error adding product: {str(e)}")
             return 0
 
+    def add_products(
+        self,
+        products: Iterable[Product],
+        on_written: Optional[Callable[[], None]] = None,
+    ) -> List[int]:
+        """Queue products to be added to the database in a batched write.
+
+        A block of indices is reserved from ``/last_item`` the first time this
+        is called; later batches keep counting from the reserved block without
+        reading it again. The batch is written once ``batch_size`` products
+        are pending, when ``flush`` is called, or when the process exits.
+
+        Args:
+            products (Iterable[Product]): Products to add
+            on_written (Callable[[], None], optional): Called once the batch
+                holding the products has been written, e.g. to record them as
+                imported; never called in test mode
+
+        Returns:
+            List[int]: Indices assigned to the products
+
+        Raises:
+            Exception: The database error, when this call triggered a batch
+                write that failed; the products stay queued
+        """
+        products = list(products)
+        if self.test_mode:
+            for product in products:
+                logger.info(f"Test mode: Would add product {product.name}")
+            return [0] * len(products)
+
+        with self._batch_lock:
+            if self._next_index is None:
+                self._next_index = self.get_last_item_index() + 1
+
+            indices = []
+            for product in products:
+                index = self._next_index
+                self._next_index += 1
+                self._pending_updates[f"itens/{index}"] = product.to_dict()
+                indices.append(index)
+
+            if indices:
+                self._pending_updates["last_item"] = indices[-1]
+            self._pending_count += len(indices)
+            if on_written:
+                self._pending_callbacks.append(on_written)
+
+            if self._pending_count >= self.batch_size:
+                self.flush()
+
+        return indices
+
+    def update_products(self, products: Iterable[Tuple[int, Product]]) -> None:
+        """Queue product updates to be written in a batched write.
+
+        Fields are written individually, so fields not present in the payload
+        are kept, the same as ``update_product``.
+
+        Args:
+            products (Iterable[Tuple[int, Product]]): Index and product pairs
+        """
+        if self.test_mode:
+            return
+
+        for index, product in products:
+            self.update_product_fields(index, product.to_dict())
+
+    def update_product_fields(
+        self,
+        index: int,
+        fields: Dict[str, Any],
+        on_written: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Queue a write of only some fields of a product.
+
+        Args:
+            index (int): Product index
+            fields (Dict[str, Any]): Stored field names and their new values
+            on_written (Callable[[], None], optional): Called once the batch
+                holding the fields has been written; never called in test mode
+
+        Raises:
+            Exception: The database error, when this call triggered a batch
+                write that failed; the fields stay queued
+        """
+        if self.test_mode:
+            return
+        if not fields:
+            if on_written:
+                on_written()
+            return
+
+        with self._batch_lock:
+            for key, value in fields.items():
+                self._pending_updates[f"items/{index}/{key}"] = value
+            self._pending_count += 1
+            if on_written:
+                self._pending_callbacks.append(on_written)
+
+            if self._pending_count >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> int:
+        """Write all pending batched products in one atomic multi-path update.
+
+        If the write fails, the products stay queued, with the indices they
+        were assigned, and are retried by the next flush.
+
+        Returns:
+            int: Number of products written
+
+        Raises:
+            Exception: The database error, when the write failed
+        """
+        if self.test_mode:
+            return 0
+
+        with self._batch_lock:
+            if not self._pending_updates:
+                return 0
+
+            updates = self._pending_updates
+            count = self._pending_count
+            callbacks = self._pending_callbacks
+
+            try:
+                db.reference("/").update(updates)
+            except Exception as e:
+                logger.error(
+                    f"Error flushing {count} batched products, "
+                    f"keeping them queued: {str(e)}"
+                )
+                # The write may have landed before the error, e.g. on a timeout
+                self._invalidate_written(updates)
+                raise
+
+            self._pending_updates = {}
+            self._pending_count = 0
+            self._pending_callbacks = []
+            self._invalidate_written(updates)
+            if "last_item" in updates:
+                self.cache.put("/last_item", updates["last_item"])
+            logger.info(f"Flushed {count} products in a single batched write")
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in batched write callback: {str(e)}")
+        return count
+
+    def _flush_at_exit(self) -> None:
+        """Write what is still queued when the process exits."""
+        try:
+            self.flush()
+        except Exception:
+            logger.error(
+                f"{self._pending_count} queued products were not written "
+                f"before exiting"
+            )
+
+    def _invalidate_written(self, updates: Dict[str, Any]) -> None:
+        """Drop the cached reads a multi-path update has made stale."""
+        for path in updates:
+            self.cache.invalidate(path)
+
+    def __enter__(self) -> "FirebaseManager":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+        self.stop_cache_listeners()
+
     def update_product(self, index: int, product: Product) -> bool:
         """Update a product in the database."""
         try:
@@ -91,11 +355,19 @@ class FirebaseManager:
         except Exception as e:
             logger.error(f"Error updating product at index {index}: {str(e)}")
             return False
+        finally:
+            self.cache.invalidate(f"/items/{index}")
 
     def get_product(self, index: int) -> Optional[Product]:
-        """Get a product from the database."""
+        """Get a product from the database.
+
+        Reads are cached; a cached product is returned until it expires or
+        this manager writes it.
+        """
         try:
-            product_data = db.reference(f"/items/{index}").get()
+            product_data = self.cache.get_or_load(
+                f"/items/{index}", lambda: db.reference(f"/items/{index}").get()
+            )
             if product_data:
                 return Product.from_dict(product_data)
             return None
@@ -103,15 +375,107 @@ class FirebaseManager:
             logger.error(f"Error getting product at index {index}: {str(e)}")
             return None
 
+    def _get_products_page(
+        self, start_key: Optional[str], page_size: int
+    ) -> List[Tuple[str, Any]]:
+        """Fetch one key-ordered page of ``/items`` starting at ``start_key``."""
+        query = db.reference("/items").order_by_key()
+        if start_key is not None:
+            # start_at is inclusive, so fetch one extra item and drop the cursor
+            query = query.start_at(start_key).limit_to_first(page_size + 1)
+        else:
+            query = query.limit_to_first(page_size)
+
+        result = query.get() or {}
+        if isinstance(result, list):
+            # Mostly sequential integer keys come back as a JSON array indexed
+            # by key, with None for the missing ones
+            page = [(str(key), value) for key, value in enumerate(result) if value]
+        else:
+            page = list(result.items())
+        if start_key is not None and page and str(page[0][0]) == start_key:
+            page = page[1:]
+        return page
+
+    def _iter_records(self, page_size: int) -> Iterator[Tuple[str, Any]]:
+        """Iterate over the raw ``/items`` records, in key-ordered pages.
+
+        The next page is requested in the background while the current one is
+        being consumed, and only one page is kept in memory at a time.
+
+        Raises:
+            Exception: The database error of a page that could not be read, so
+                a failed read is not mistaken for the end of the catalog
+        """
+        if self.test_mode:
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            next_page = executor.submit(self._get_products_page, None, page_size)
+            while next_page is not None:
+                try:
+                    page = next_page.result()
+                except Exception as e:
+                    logger.error(f"Error getting products page: {str(e)}")
+                    raise
+
+                next_page = None
+                if len(page) >= page_size:
+                    next_page = executor.submit(
+                        self._get_products_page, str(page[-1][0]), page_size
+                    )
+
+                for key, product_data in page:
+                    if product_data:
+                        yield key, product_data
+
+    def iter_products(
+        self, page_size: int = FIREBASE_PAGE_SIZE
+    ) -> Iterator[Tuple[int, Product]]:
+        """Iterate over all products, reading ``/items`` in key-ordered pages.
+
+        Args:
+            page_size (int): Number of products fetched per request
+
+        Yields:
+            Tuple[int, Product]: Index and product
+
+        Raises:
+            Exception: The database error of a page that could not be read
+        """
+        for key, product_data in self._iter_records(page_size):
+            try:
+                yield int(key), Product.from_dict(product_data)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Error parsing product at index {key}: {str(e)}")
+
     def get_all_products(self) -> List[Product]:
         """Get all products from the database."""
         products = []
         try:
-            last_index = self.get_last_item_index()
-            for index in range(1, last_index + 1):
-                product = self.get_product(index)
-                if product:
-                    products.append(product)
+            for _, product in self.iter_products():
+                products.append(product)
         except Exception as e:
             logger.error(f"Error getting all products: {str(e)}")
         return products
+
+    def get_product_batch(self, page_size: int = FIREBASE_PAGE_SIZE) -> ProductBatch:
+        """Get all products as a columnar batch.
+
+        Much lighter than ``get_all_products`` for a large catalog, as the
+        records are converted a column at a time instead of into one
+        ``Product`` each.
+
+        Args:
+            page_size (int): Number of products fetched per request
+
+        Returns:
+            ProductBatch: One row per stored product, in index order
+        """
+        try:
+            return ProductBatch.from_records(
+                product_data for _, product_data in self._iter_records(page_size)
+            )
+        except Exception as e:
+            logger.error(f"Error getting product batch: {str(e)}")
+            return ProductBatch.from_records([])
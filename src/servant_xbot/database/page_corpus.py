@@ -0,0 +1,116 @@
+import sqlite3
+import logging
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from config.settings import ERROR_LOG_PATH, PAGE_CORPUS_PATH
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+# Page types recorded by the scraper
+BESTSELLER_PAGE = "bestseller"
+PRODUCT_PAGE = "product"
+
+
+class PageCorpus:
+    """Local archive of fetched Amazon pages for offline replay.
+
+    Each recorded page keeps its URL, page type, fetch time and the
+    zlib-compressed HTML. Recording the same URL again keeps both copies;
+    lookups return the latest one.
+    """
+
+    def __init__(self, path: Path = PAGE_CORPUS_PATH):
+        """Open (or create) the corpus database.
+
+        Args:
+            path (Path): SQLite database file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "id INTEGER PRIMARY KEY, url TEXT NOT NULL, page_type TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, html BLOB NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_url ON pages (url)")
+        self._conn.commit()
+
+    def record(self, url: str, html_body: str, page_type: str) -> None:
+        """Archive a fetched page.
+
+        Args:
+            url (str): URL the page was fetched from
+            html_body (str): Page HTML
+            page_type (str): ``bestseller`` or ``product``
+        """
+        html = zlib.compress(html_body.encode("utf-8"), 6)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO pages (url, page_type, fetched_at, html) "
+                    "VALUES (?, ?, ?, ?)",
+                    (url, page_type, time.time(), html),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error recording {url}: {str(e)}")
+
+    def get(self, url: str) -> Optional[str]:
+        """Get the latest recorded HTML of a URL, None if it was never recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT html FROM pages WHERE url = ? ORDER BY id DESC LIMIT 1",
+                (url,),
+            ).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def iter_pages(
+        self, page_type: Optional[str] = None
+    ) -> Iterator[Tuple[str, str, float, str]]:
+        """Iterate the recorded pages in recording order.
+
+        Args:
+            page_type (str, optional): Only return pages of this type
+
+        Yields:
+            Tuple[str, str, float, str]: URL, page type, fetch time and HTML
+        """
+        # Read in small batches so a large corpus is never loaded at once
+        query = "SELECT id, url, page_type, fetched_at, html FROM pages WHERE id > ?"
+        params: tuple = ()
+        if page_type:
+            query += " AND page_type = ?"
+            params = (page_type,)
+        query += " ORDER BY id LIMIT 100"
+
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, (last_id,) + params).fetchall()
+            if not rows:
+                return
+            for last_id, url, row_type, fetched_at, html in rows:
+                yield url, row_type, fetched_at, zlib.decompress(html).decode("utf-8")
+
+    def count(self, page_type: Optional[str] = None) -> int:
+        """Number of recorded pages, optionally of a single type."""
+        with self._lock:
+            if page_type:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM pages WHERE page_type = ?", (page_type,)
+                ).fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,203 @@
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import ERROR_LOG_PATH, PRICE_HISTORY_DIR
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+# Column files and their element types
+COLUMNS = {
+    "ids": np.uint32,
+    "timestamps": np.int64,
+    "prices": np.float64,
+}
+
+
+class PriceHistory:
+    """Append-only, columnar price history stored in memory-mapped files.
+
+    Every observation is one row of three parallel columns (ASIN id, Unix
+    timestamp, price), each kept in its own raw binary file. ASIN ids are line
+    numbers of ``asins.txt``. Rows are only ever appended, and queries read
+    the columns through ``np.memmap`` so they run vectorized without loading
+    the history into Python objects.
+    """
+
+    def __init__(self, directory: Path = PRICE_HISTORY_DIR):
+        """Open (or create) the price history.
+
+        Args:
+            directory (Path): Directory holding the column files
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, list] = {name: [] for name in COLUMNS}
+
+        self._asins: List[str] = []
+        self._asin_ids: Dict[str, int] = {}
+        asins_path = self.directory / "asins.txt"
+        if asins_path.exists():
+            for line in asins_path.read_text().splitlines():
+                self._asin_ids[line] = len(self._asins)
+                self._asins.append(line)
+
+    def _column_path(self, name: str) -> Path:
+        return self.directory / f"{name}.bin"
+
+    def _asin_id(self, asin: str) -> int:
+        asin_id = self._asin_ids.get(asin)
+        if asin_id is None:
+            asin_id = len(self._asins)
+            with open(self.directory / "asins.txt", "a") as file:
+                file.write(f"{asin}\n")
+            self._asin_ids[asin] = asin_id
+            self._asins.append(asin)
+        return asin_id
+
+    def start_run(self, timestamp: Optional[float] = None) -> None:
+        """Mark the start of a refresh run, used by ``biggest_drops``."""
+        run = np.array([int(timestamp or time.time())], dtype=np.int64)
+        with self._lock, open(self.directory / "runs.bin", "ab") as file:
+            run.tofile(file)
+
+    def append(
+        self, asin: str, price: float, timestamp: Optional[float] = None
+    ) -> None:
+        """Buffer a price observation; it is written on ``flush``.
+
+        Args:
+            asin (str): Product ASIN
+            price (float): Observed price
+            timestamp (float, optional): Unix time, defaults to now
+        """
+        with self._lock:
+            self._pending["ids"].append(self._asin_id(asin))
+            self._pending["timestamps"].append(int(timestamp or time.time()))
+            self._pending["prices"].append(price)
+
+    def flush(self) -> None:
+        """Append buffered observations to the column files."""
+        with self._lock:
+            if not self._pending["ids"]:
+                return
+            for name, dtype in COLUMNS.items():
+                with open(self._column_path(name), "ab") as file:
+                    np.asarray(self._pending[name], dtype=dtype).tofile(file)
+                self._pending[name] = []
+
+    def __enter__(self) -> "PriceHistory":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.flush()
+
+    def _read(self, path: Path, dtype) -> np.ndarray:
+        if not path.exists() or path.stat().st_size < np.dtype(dtype).itemsize:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def _columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Memory-map the columns, ignoring a partially written last row."""
+        ids, timestamps, prices = (
+            self._read(self._column_path(name), dtype)
+            for name, dtype in COLUMNS.items()
+        )
+        rows = min(len(ids), len(timestamps), len(prices))
+        return ids[:rows], timestamps[:rows], prices[:rows]
+
+    def window_stats(self, asin: str, since: float) -> Optional[Dict[str, float]]:
+        """Get min/max/mean price of an ASIN since a Unix timestamp.
+
+        Args:
+            asin (str): Product ASIN
+            since (float): Window start as Unix time
+
+        Returns:
+            Optional[Dict[str, float]]: ``min``, ``max``, ``mean`` and
+            ``count``, or None if there is no observation in the window
+        """
+        asin_id = self._asin_ids.get(asin)
+        if asin_id is None:
+            return None
+
+        ids, timestamps, prices = self._columns()
+        window = prices[(ids == asin_id) & (timestamps >= since)]
+        if not len(window):
+            return None
+        return {
+            "min": float(window.min()),
+            "max": float(window.max()),
+            "mean": float(window.mean()),
+            "count": int(len(window)),
+        }
+
+    def all_time_lows(self) -> Dict[str, float]:
+        """Get the lowest price ever observed for every ASIN."""
+        ids, _, prices = self._columns()
+        lows = np.full(len(self._asins), np.inf)
+        np.minimum.at(lows, ids, prices)
+        return {
+            self._asins[asin_id]: float(lows[asin_id])
+            for asin_id in np.flatnonzero(np.isfinite(lows))
+        }
+
+    def all_time_low(self, asin: str) -> Optional[float]:
+        """Get the lowest price ever observed for an ASIN."""
+        asin_id = self._asin_ids.get(asin)
+        if asin_id is None:
+            return None
+
+        ids, _, prices = self._columns()
+        observed = prices[ids == asin_id]
+        return float(observed.min()) if len(observed) else None
+
+    def _latest_prices(
+        self, ids: np.ndarray, timestamps: np.ndarray, prices: np.ndarray
+    ) -> np.ndarray:
+        """Latest price per ASIN id, NaN for ASINs without observations."""
+        latest = np.full(len(self._asins), np.nan)
+        if not len(ids):
+            return latest
+        order = np.lexsort((timestamps, ids))
+        sorted_ids = ids[order]
+        last_of_id = np.append(sorted_ids[1:] != sorted_ids[:-1], True)
+        latest[sorted_ids[last_of_id]] = prices[order][last_of_id]
+        return latest
+
+    def biggest_drops(self, limit: int = 10) -> List[Tuple[str, float, float]]:
+        """Get the largest price drops of the latest run.
+
+        Compares the last price seen before the latest ``start_run`` with the
+        last price seen after it.
+
+        Args:
+            limit (int): Maximum number of drops returned
+
+        Returns:
+            List[Tuple[str, float, float]]: ASIN, previous and current price,
+            largest drop first
+        """
+        runs = self._read(self.directory / "runs.bin", np.int64)
+        if not len(runs):
+            return []
+
+        ids, timestamps, prices = self._columns()
+        before = timestamps < runs[-1]
+        after = ~before
+        previous = self._latest_prices(ids[before], timestamps[before], prices[before])
+        current = self._latest_prices(ids[after], timestamps[after], prices[after])
+
+        drops = previous - current
+        dropped = np.flatnonzero(np.nan_to_num(drops) > 0)
+        dropped = dropped[np.argsort(drops[dropped])[::-1][:limit]]
+        return [
+            (self._asins[asin_id], float(previous[asin_id]), float(current[asin_id]))
+            for asin_id in dropped
+        ]
@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from config.settings import ERROR_LOG_PATH
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+
+def normalize_path(path: str) -> str:
+    """Database path without leading or trailing slashes ("" is the root)."""
+    return path.strip("/")
+
+
+class ReadCache:
+    """In-memory read-through cache of database paths.
+
+    Entries expire after the TTL of the longest configured path prefix they
+    fall under, and the least recently used entry is evicted once the cache
+    is full. Writes invalidate the written path, everything below it and
+    every cached ancestor, since an ancestor's value contains the write.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        default_ttl: float,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries (int): Entries kept before evicting; 0 disables caching
+            default_ttl (float): Seconds an entry stays fresh
+            ttls (Dict[str, float], optional): Seconds an entry stays fresh,
+                by path prefix, e.g. ``{"/last_item": 10}``
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = {normalize_path(path): ttl for path, ttl in (ttls or {}).items()}
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        # Bumped by every invalidation, so a load that raced with a write is
+        # not cached
+        self._generation = 0
+
+    def ttl(self, path: str) -> float:
+        """Get the TTL of a path, from its longest configured prefix."""
+        path = normalize_path(path)
+        while True:
+            if path in self.ttls:
+                return self.ttls[path]
+            if not path:
+                return self.default_ttl
+            path = path.rpartition("/")[0]
+
+    def get_or_load(self, path: str, loader: Callable[[], Any]) -> Any:
+        """Get a path's cached value, loading and caching it on a miss.
+
+        Args:
+            path (str): Database path
+            loader (Callable[[], Any]): Reads the path from the database;
+                exceptions propagate and nothing is cached
+
+        Returns:
+            Any: The path's value
+        """
+        path = normalize_path(path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return value
+                del self._entries[path]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        value = loader()
+        with self._lock:
+            if generation == self._generation:
+                self._store(path, value)
+        return value
+
+    def put(self, path: str, value: Any) -> None:
+        """Cache the value of a path, e.g. one just written."""
+        path = normalize_path(path)
+        with self._lock:
+            self._store(path, value)
+
+    def _store(self, path: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[path] = (time.monotonic() + self.ttl(path), value)
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, path: str) -> None:
+        """Drop a path, the paths below it and its cached ancestors."""
+        path = normalize_path(path)
+        with self._lock:
+            stale = [
+                key
+                for key in self._entries
+                if not path
+                or key == path
+                or key.startswith(path + "/")
+                or not key
+                or path.startswith(key + "/")
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+            self._generation += 1
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the counters of the cache, for tuning its size and TTLs."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def log_stats(self) -> None:
+        """Log the counters of the run."""
+        stats = self.stats()
+        logger.info(
+            f"Database read cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.1%} hit rate), {stats['evictions']} evictions, "
+            f"{stats['expirations']} expirations, "
+            f"{stats['invalidations']} invalidations"
+        )
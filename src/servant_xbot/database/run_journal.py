@@ -0,0 +1,134 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from config.settings import ERROR_LOG_PATH, JOURNAL_DIR
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+
+class RunJournal:
+    """Append-only record of the work a long run has completed.
+
+    Every finished item is appended as one JSON line keyed by stage and item
+    key (a category URL, an ASIN...), and flushed immediately, so the journal
+    survives a Chrome crash, a captcha wall or a killed process. A resumed run
+    skips the completed items. A run that finishes successfully compacts the
+    journal and marks it complete, so the next run starts from scratch.
+    """
+
+    def __init__(
+        self, name: str, resume: bool = False, directory: Path = JOURNAL_DIR
+    ):
+        """Open the journal of a job.
+
+        Args:
+            name (str): Job name, e.g. the script name
+            resume (bool): Keep the items completed by an interrupted run;
+                otherwise the journal is started over
+            directory (Path): Directory holding the journals
+        """
+        self.path = Path(directory) / f"{name}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._done: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+        completed = False
+        if resume:
+            completed = self._load()
+            if completed:
+                logger.info("Previous run completed, nothing to resume")
+            elif self._done:
+                logger.info(f"Resuming run, {len(self._done)} items already done")
+
+        if not resume or completed:
+            self._done = {}
+            self.path.write_text("")
+        self._file = open(self.path, "a")
+        if self._file.tell():
+            with open(self.path, "rb") as file:
+                file.seek(-1, 2)
+                if file.read() != b"\n":
+                    # Start after the line cut short by the crash, not inside it
+                    self._file.write("\n")
+
+    def _load(self) -> bool:
+        """Read the journal, returning True if its run completed."""
+        completed = False
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by the crash
+                        continue
+                    if entry.get("complete"):
+                        completed = True
+                        continue
+                    self._done[(entry["stage"], entry["key"])] = entry.get("data")
+        except FileNotFoundError:
+            pass
+        return completed
+
+    def is_done(self, stage: str, key: str) -> bool:
+        """Check if an item was completed by this run or the resumed one."""
+        with self._lock:
+            return (stage, key) in self._done
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Get the data recorded with a completed item."""
+        with self._lock:
+            return self._done.get((stage, key))
+
+    def mark_done(self, stage: str, key: str, data: Optional[Any] = None) -> None:
+        """Record that an item is complete.
+
+        Args:
+            stage (str): Stage that completed the item
+            key (str): Item key within the stage
+            data (Any, optional): JSON-serializable result needed to resume
+                the following stages without redoing this one
+        """
+        entry = {"stage": stage, "key": key}
+        if data is not None:
+            entry["data"] = data
+        with self._lock:
+            self._done[(stage, key)] = data
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def complete(self) -> None:
+        """Compact the journal and mark its run complete.
+
+        Compaction rewrites the journal with one line per completed item,
+        dropping duplicates and any line cut short by an earlier crash.
+        """
+        with self._lock:
+            self._file.close()
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w") as file:
+                for (stage, key), data in self._done.items():
+                    entry = {"stage": stage, "key": key}
+                    if data is not None:
+                        entry["data"] = data
+                    file.write(json.dumps(entry) + "\n")
+                file.write(json.dumps({"complete": True}) + "\n")
+            temp_path.replace(self.path)
+            self._file = open(self.path, "a")
+        logger.info(f"Run journal compacted to {len(self._done)} items")
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
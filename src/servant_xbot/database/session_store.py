@@ -0,0 +1,211 @@
+import json
+import pickle
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import httpx
+import undetected_chromedriver as uc
+from config.settings import (
+    COOKIES_PATH,
+    ERROR_LOG_PATH,
+    SESSION_REFRESH_MARGIN_HOURS,
+    SESSION_STORE_PATH,
+)
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+# Authentication cookies of a signed-in amazon.com.br session
+SESSION_COOKIE_NAMES = ("at-acbbr", "sess-at-acbbr")
+
+# Fields of a CDP Network.Cookie accepted back by Network.setCookies
+COOKIE_PARAM_KEYS = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+    "expires",
+    "priority",
+)
+
+
+def normalize_cookie(cookie: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a CDP or Selenium cookie to a CDP ``Network.setCookies`` param.
+
+    Selenium names the expiry ``expiry``; CDP marks session cookies with
+    ``session`` and a negative ``expires``. Session cookies are stored without
+    an expiry.
+    """
+    normalized = {key: cookie[key] for key in COOKIE_PARAM_KEYS if key in cookie}
+    if "expiry" in cookie:
+        normalized["expires"] = cookie["expiry"]
+    if cookie.get("session") or normalized.get("expires", 0) <= 0:
+        normalized.pop("expires", None)
+    return normalized
+
+
+class SessionStore:
+    """Amazon session cookies with their expiry and last validation time.
+
+    One login writes the store, and every driver and HTTP client of a run is
+    seeded from it, so a parallel run costs a single login. The store knows
+    when the authentication cookies expire, so the session is renewed before
+    it lapses instead of failing halfway through a run.
+    """
+
+    def __init__(
+        self,
+        path: Path = SESSION_STORE_PATH,
+        refresh_margin_hours: float = SESSION_REFRESH_MARGIN_HOURS,
+        legacy_path: Path = COOKIES_PATH,
+    ):
+        """Load the store, migrating the old pickled cookies if needed.
+
+        Args:
+            path (Path): JSON file holding the session
+            refresh_margin_hours (float): Renew the session when its
+                authentication cookies expire within this many hours
+            legacy_path (Path): Pickled cookies saved by older versions
+        """
+        self.path = Path(path)
+        self.refresh_margin = refresh_margin_hours * 3600
+        self.cookies: List[Dict[str, Any]] = []
+        self.saved_at: Optional[float] = None
+        self.validated_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+        try:
+            with open(self.path, "r") as file:
+                state = json.load(file)
+            self.cookies = state.get("cookies", [])
+            self.saved_at = state.get("saved_at")
+            self.validated_at = state.get("validated_at")
+        except FileNotFoundError:
+            self._migrate(Path(legacy_path))
+        except (ValueError, OSError) as e:
+            logger.error(f"Error loading session store, starting empty: {str(e)}")
+
+    def _migrate(self, legacy_path: Path) -> None:
+        """Import the cookies pickled by older versions."""
+        try:
+            with open(legacy_path, "rb") as file:
+                cookies = pickle.load(file)
+        except (FileNotFoundError, EOFError):
+            return
+        except Exception as e:
+            logger.warning(f"Could not migrate {legacy_path}: {str(e)}")
+            return
+
+        # Never validated, so the first run verifies it before trusting it
+        self.save(cookies, validated=False)
+        logger.info(f"Migrated {len(self.cookies)} cookies from {legacy_path}")
+
+    def _write(self) -> None:
+        state = {
+            "cookies": self.cookies,
+            "saved_at": self.saved_at,
+            "validated_at": self.validated_at,
+        }
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w") as file:
+            json.dump(state, file)
+        temp_path.replace(self.path)
+
+    def save(self, cookies: List[Dict[str, Any]], validated: bool = True) -> None:
+        """Replace the stored session.
+
+        Args:
+            cookies (List[Dict[str, Any]]): CDP or Selenium cookies; only the
+                Amazon ones are kept
+            validated (bool): Whether the cookies were just seen signed in
+        """
+        with self._lock:
+            self.cookies = [
+                normalize_cookie(cookie)
+                for cookie in cookies
+                if "amazon" in cookie.get("domain", "")
+            ]
+            self.saved_at = time.time()
+            if validated:
+                self.validated_at = self.saved_at
+            try:
+                self._write()
+            except OSError as e:
+                logger.error(f"Error saving session store: {str(e)}")
+
+    def mark_validated(self) -> None:
+        """Record that the stored session was just seen signed in."""
+        with self._lock:
+            self.validated_at = time.time()
+            try:
+                self._write()
+            except OSError as e:
+                logger.error(f"Error saving session store: {str(e)}")
+
+    def live_cookies(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Get the stored cookies that have not expired."""
+        now = now or time.time()
+        with self._lock:
+            return [
+                cookie
+                for cookie in self.cookies
+                if cookie.get("expires") is None or cookie["expires"] > now
+            ]
+
+    def expires_at(self) -> Optional[float]:
+        """Unix time at which the authentication cookies expire.
+
+        Returns:
+            Optional[float]: Earliest expiry of the authentication cookies,
+            ``inf`` if they only live for the browser session, None if the
+            store holds no authentication cookie
+        """
+        with self._lock:
+            expiries = [
+                cookie.get("expires", float("inf"))
+                for cookie in self.cookies
+                if cookie["name"] in SESSION_COOKIE_NAMES
+            ]
+        return min(expiries) if expiries else None
+
+    def needs_refresh(self, now: Optional[float] = None) -> bool:
+        """Check if the session is missing or expires within the margin."""
+        now = now or time.time()
+        expires_at = self.expires_at()
+        return expires_at is None or expires_at - now < self.refresh_margin
+
+    def apply_to_driver(self, driver: uc.Chrome) -> int:
+        """Set every live cookie in a driver with a single CDP call.
+
+        The driver does not need to be on an Amazon page first.
+
+        Returns:
+            int: Number of cookies set
+        """
+        cookies = self.live_cookies()
+        if cookies:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        return len(cookies)
+
+    def apply_to_http_client(self, client: httpx.Client) -> int:
+        """Set every live cookie in an HTTP client.
+
+        Returns:
+            int: Number of cookies set
+        """
+        cookies = self.live_cookies()
+        for cookie in cookies:
+            client.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain", ""),
+                path=cookie.get("path", "/"),
+            )
+        return len(cookies)
@@ -1,18 +1,42 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import InitVar, dataclass, field
+from typing import Any, Dict, Optional, Union
 from datetime import datetime
+from ..utils.helpers import extract_asin
 
 
-@dataclass
+@dataclass(slots=True)
 class Product:
-    """Represents an Amazon product."""
+    """Represents an Amazon product.
+
+    Slotted, so a catalog of products carries no per-instance ``__dict__``.
+    ``updated_at`` also accepts the ISO timestamp read from the database,
+    which is only parsed into a datetime when it is first read.
+    """
 
     name: str
     url: str
     price: float
     affiliate_url: Optional[str] = None
     last_price: Optional[float] = None
-    updated_at: Optional[datetime] = None
+    updated_at: InitVar[Union[datetime, str, None]] = None
+    rank: Optional[int] = None
+    asin: Optional[str] = None
+    _updated_at: Union[datetime, str, None] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self, updated_at: Union[datetime, str, None]):
+        self._updated_at = updated_at
+        if not self.asin:
+            self.asin = extract_asin(self.url) or extract_asin(self.affiliate_url)
+
+    def _get_updated_at(self) -> Optional[datetime]:
+        if isinstance(self._updated_at, str):
+            self._updated_at = datetime.fromisoformat(self._updated_at)
+        return self._updated_at
+
+    def _set_updated_at(self, value: Union[datetime, str, None]) -> None:
+        self._updated_at = value
 
     def to_dict(self):
         """Convert to dictionary for database storage."""
@@ -23,11 +47,36 @@ class Product:
             "Ultimo_valor": self.last_price if self.last_price else self.price,
         }
 
-        if self.updated_at:
-            result["Data"] = self.updated_at.isoformat()
+        if isinstance(self._updated_at, str):
+            # Never parsed, so written back exactly as it was read
+            result["Data"] = self._updated_at
+        elif self._updated_at:
+            result["Data"] = self._updated_at.isoformat()
+
+        if self.asin:
+            result["ASIN"] = self.asin
 
         return result
 
+    def diff(self, other: "Product") -> Dict[str, Any]:
+        """Get the stored fields that change when replacing this product.
+
+        The timestamp is ignored, so a refresh that only moves ``Data`` has
+        no changes.
+
+        Args:
+            other (Product): Freshly scraped version of this product
+
+        Returns:
+            Dict[str, Any]: Changed fields of ``other.to_dict()``
+        """
+        current = self.to_dict()
+        return {
+            key: value
+            for key, value in other.to_dict().items()
+            if key != "Data" and current.get(key) != value
+        }
+
     @classmethod
     def from_dict(cls, data: dict) -> "Product":
         """Create a Product instance from a dictionary."""
@@ -36,7 +85,11 @@ class Product:
             url=data.get("Link", ""),
             price=float(data.get("Valor", 0.0)),
             last_price=float(data.get("Ultimo_valor", 0.0)),
-            updated_at=datetime.fromisoformat(data.get("Data"))
-            if "Data" in data
-            else None,
+            updated_at=data.get("Data"),
+            asin=data.get("ASIN"),
         )
+
+
+# Assigned after the class is built: a property in the class body would be
+# taken as the default of the ``updated_at`` init argument
+Product.updated_at = property(Product._get_updated_at, Product._set_updated_at)
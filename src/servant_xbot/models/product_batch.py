@@ -0,0 +1,184 @@
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import numpy as np
+from .product import Product
+
+# ASINs are 10 ASCII characters, stored as fixed-width bytes
+ASIN_DTYPE = "S10"
+
+
+class ProductBatch:
+    """Columnar catalog of stored products.
+
+    Each field is one array with a row per product: ASINs are fixed-width
+    bytes and prices float64 columns. Names, links and timestamps reference
+    the strings read from the database; timestamps are only parsed, into a
+    datetime64 column, when ``updated_at`` is read. A large catalog thus does
+    not hold one ``Product``, float and datetime object per row.
+    """
+
+    def __init__(
+        self,
+        names: np.ndarray,
+        links: np.ndarray,
+        asins: np.ndarray,
+        prices: np.ndarray,
+        last_prices: np.ndarray,
+        timestamps: np.ndarray,
+    ):
+        """Wrap parallel columns of the same length.
+
+        Args:
+            names (np.ndarray): Product names (object)
+            links (np.ndarray): Affiliate link, or product URL without one
+                (object)
+            asins (np.ndarray): ASINs, empty when unknown (S10)
+            prices (np.ndarray): Current prices (float64)
+            last_prices (np.ndarray): Previous prices, NaN when unknown
+                (float64)
+            timestamps (np.ndarray): ISO update times as stored, None when
+                unknown (object)
+        """
+        self.names = names
+        self.links = links
+        self.asins = asins
+        self.prices = prices
+        self.last_prices = last_prices
+        self.timestamps = timestamps
+        self._updated_at: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ProductBatch":
+        """Build a batch from stored product dicts, as read from the database.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): Dicts in the ``to_dict`` format
+
+        Returns:
+            ProductBatch: One row per record
+        """
+        records = list(records)
+        return cls(
+            names=np.array(
+                [record.get("Produto") or "" for record in records], dtype=object
+            ),
+            links=np.array(
+                [record.get("Link") or "" for record in records], dtype=object
+            ),
+            asins=np.array(
+                [record.get("ASIN") or "" for record in records], dtype=ASIN_DTYPE
+            ),
+            prices=np.array(
+                [record.get("Valor", 0.0) for record in records], dtype=np.float64
+            ),
+            last_prices=np.array(
+                [record.get("Ultimo_valor", np.nan) for record in records],
+                dtype=np.float64,
+            ),
+            timestamps=np.array(
+                [record.get("Data") for record in records], dtype=object
+            ),
+        )
+
+    @classmethod
+    def from_products(cls, products: Iterable[Product]) -> "ProductBatch":
+        """Build a batch from products."""
+        return cls.from_records(product.to_dict() for product in products)
+
+    @property
+    def updated_at(self) -> np.ndarray:
+        """Update times as datetime64[us], NaT when unknown.
+
+        Parsed by NumPy in one call when first read.
+        """
+        if self._updated_at is None:
+            values = [value or "NaT" for value in self.timestamps.tolist()]
+            try:
+                self._updated_at = np.array(values, dtype="datetime64[us]")
+            except ValueError:
+                # One bad timestamp fails the whole column, so go one by one
+                self._updated_at = np.array(
+                    [_parse_timestamp(value) for value in values],
+                    dtype="datetime64[us]",
+                )
+        return self._updated_at
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert every row to the stored dict format of ``Product.to_dict``.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per row
+        """
+        # A missing or zero last price is stored as the current price
+        last_prices = np.where(
+            np.isnan(self.last_prices) | (self.last_prices == 0),
+            self.prices,
+            self.last_prices,
+        )
+
+        dicts = []
+        for name, link, price, last_price, timestamp, asin in zip(
+            self.names.tolist(),
+            self.links.tolist(),
+            self.prices.tolist(),
+            last_prices.tolist(),
+            self.timestamps.tolist(),
+            self.asins.astype("U10").tolist(),
+        ):
+            result = {
+                "Produto": name,
+                "Link": link,
+                "Valor": price,
+                "Ultimo_valor": last_price,
+            }
+            if timestamp:
+                result["Data"] = timestamp
+            if asin:
+                result["ASIN"] = asin
+            dicts.append(result)
+        return dicts
+
+    def product(self, row: int) -> Product:
+        """Build the product of one row."""
+        last_price = float(self.last_prices[row])
+        return Product(
+            name=self.names[row],
+            url=self.links[row],
+            price=float(self.prices[row]),
+            last_price=None if np.isnan(last_price) else last_price,
+            updated_at=self.timestamps[row],
+            asin=self.asins[row].decode("ascii") or None,
+        )
+
+    def nbytes(self) -> int:
+        """Memory held by the batch, including the strings it references."""
+        strings = {
+            id(value): value
+            for column in (self.names, self.links, self.timestamps)
+            for value in column.tolist()
+            if value is not None
+        }
+        return (
+            self.names.nbytes
+            + self.links.nbytes
+            + self.asins.nbytes
+            + self.prices.nbytes
+            + self.last_prices.nbytes
+            + self.timestamps.nbytes
+            + (self._updated_at.nbytes if self._updated_at is not None else 0)
+            + sum(sys.getsizeof(value) for value in strings.values())
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __iter__(self) -> Iterator[Product]:
+        for row in range(len(self)):
+            yield self.product(row)
+
+
+def _parse_timestamp(value: str) -> np.datetime64:
+    try:
+        return np.datetime64(value, "us")
+    except ValueError:
+        return np.datetime64("NaT", "us")
@@ -0,0 +1,145 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional
+from config.settings import ERROR_LOG_PATH
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+
+@dataclass
+class StageMetrics:
+    """Counters collected for a pipeline stage."""
+
+    processed: int = 0
+    errors: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+
+@dataclass
+class Stage:
+    """A pipeline stage.
+
+    ``handler`` is a blocking function run in a worker thread. It receives one
+    item and returns the items to pass to the next stage (or None).
+    """
+
+    name: str
+    handler: Callable[[Any], Optional[Iterable[Any]]]
+    concurrency: int = 1
+    queue_size: int = 10
+    metrics: StageMetrics = field(default_factory=StageMetrics)
+
+
+class Pipeline:
+    """Runs stages connected by bounded queues.
+
+    Each stage has its own workers, so slow browser stages overlap with
+    database and file I/O. A full queue blocks the upstream stage, which
+    keeps memory bounded when a downstream stage falls behind.
+    """
+
+    def __init__(self, stages: List[Stage], metrics_interval: float = 30.0):
+        """Initialize the pipeline.
+
+        Args:
+            stages (List[Stage]): Stages in processing order
+            metrics_interval (float): Seconds between queue-depth log lines,
+                0 disables periodic logging
+        """
+        self.stages = stages
+        self.metrics_interval = metrics_interval
+
+    def _sample_queue_depths(self, queues: List[asyncio.Queue]) -> None:
+        for stage, stage_queue in zip(self.stages, queues):
+            stage.metrics.queue_depth = stage_queue.qsize()
+            stage.metrics.max_queue_depth = max(
+                stage.metrics.max_queue_depth, stage.metrics.queue_depth
+            )
+
+    async def _worker(
+        self,
+        stage: Stage,
+        inbox: asyncio.Queue,
+        outbox: Optional[asyncio.Queue],
+        queues: List[asyncio.Queue],
+    ) -> None:
+        while True:
+            item = await inbox.get()
+            # Sampled on takes too, so the depth also goes down as items drain
+            self._sample_queue_depths(queues)
+            try:
+                outputs = await asyncio.to_thread(stage.handler, item)
+                stage.metrics.processed += 1
+                if outbox is not None:
+                    for output in outputs or ():
+                        await outbox.put(output)
+                        self._sample_queue_depths(queues)
+            except Exception as e:
+                stage.metrics.errors += 1
+                logger.error(f"Error in pipeline stage {stage.name}: {str(e)}")
+            finally:
+                inbox.task_done()
+
+    async def _report_metrics(self, queues: List[asyncio.Queue]) -> None:
+        while True:
+            await asyncio.sleep(self.metrics_interval)
+            self._sample_queue_depths(queues)
+            depths = ", ".join(
+                f"{stage.name}: {stage.metrics.queue_depth}/{stage.queue_size}"
+                for stage in self.stages
+            )
+            logger.info(f"Pipeline queue depths - {depths}")
+
+    async def run(self, items: Iterable[Any]) -> None:
+        """Feed items to the first stage and wait until every stage is drained.
+
+        Args:
+            items (Iterable[Any]): Input items of the first stage
+        """
+        queues = [asyncio.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        workers = []
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(queues) else None
+            workers.append(
+                [
+                    asyncio.create_task(self._worker(stage, queues[i], outbox, queues))
+                    for _ in range(max(1, stage.concurrency))
+                ]
+            )
+
+        reporter = None
+        if self.metrics_interval > 0:
+            reporter = asyncio.create_task(self._report_metrics(queues))
+
+        try:
+            for item in items:
+                await queues[0].put(item)
+                self._sample_queue_depths(queues)
+
+            # A stage is done once its queue is drained and every upstream
+            # stage has finished producing
+            for stage_queue, stage_workers in zip(queues, workers):
+                await stage_queue.join()
+                for worker in stage_workers:
+                    worker.cancel()
+                await asyncio.gather(*stage_workers, return_exceptions=True)
+                # The final depths, once the stage has drained
+                self._sample_queue_depths(queues)
+        finally:
+            if reporter:
+                reporter.cancel()
+            for stage_workers in workers:
+                for worker in stage_workers:
+                    worker.cancel()
+
+        for stage in self.stages:
+            logger.info(
+                f"Stage {stage.name}: {stage.metrics.processed} processed, "
+                f"{stage.metrics.errors} errors, "
+                f"max queue depth {stage.metrics.max_queue_depth}/{stage.queue_size}"
+            )
@@ -0,0 +1,213 @@
+import json
+import heapq
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config.settings import (
+    ERROR_LOG_PATH,
+    REFRESH_BASE_INTERVAL_HOURS,
+    REFRESH_QUEUE_PATH,
+)
+from .models.product import Product
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+HOUR = 3600.0
+MIN_INTERVAL = HOUR
+MAX_INTERVAL = 7 * 24 * HOUR
+# Weight of the newest observed change in the volatility moving average
+VOLATILITY_SMOOTHING = 0.3
+
+
+class RefreshScheduler:
+    """Decides which products to refresh, and when.
+
+    Every product gets a next-refresh time. Products whose price moves often,
+    changed recently, or rank high in the bestsellers are refreshed sooner.
+    Each run refreshes the most overdue products within a fixed hourly
+    budget. The queue is persisted between runs.
+    """
+
+    def __init__(
+        self,
+        path: Path = REFRESH_QUEUE_PATH,
+        base_interval_hours: float = REFRESH_BASE_INTERVAL_HOURS,
+    ):
+        """Load the persisted queue.
+
+        Args:
+            path (Path): JSON file holding the queue
+            base_interval_hours (float): Refresh interval of a product with
+                average volatility, recency and rank
+        """
+        self.path = Path(path)
+        self.base_interval = base_interval_hours * HOUR
+        self.last_run: Optional[float] = None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        try:
+            with open(self.path, "r") as file:
+                state = json.load(file)
+            self.last_run = state.get("last_run")
+            self.entries = state.get("entries", {})
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            logger.error(f"Error loading refresh queue, starting empty: {str(e)}")
+
+    @staticmethod
+    def key(index: int, product: Product) -> str:
+        """Get the queue key of a product."""
+        return product.asin or f"index:{index}"
+
+    def budget(self, pages_per_hour: int, now: Optional[float] = None) -> int:
+        """Number of pages this run may refresh.
+
+        The budget accrues at ``pages_per_hour`` since the last run, up to one
+        day's worth; a first run gets one hour's worth.
+        """
+        now = now or time.time()
+        elapsed = now - self.last_run if self.last_run else HOUR
+        elapsed = min(max(elapsed, 0.0), 24 * HOUR)
+        return max(1, round(pages_per_hour * elapsed / HOUR))
+
+    def _interval(self, entry: Dict[str, Any], now: float) -> float:
+        # Average relative price change per refresh, e.g. 0.05 for 5%
+        volatility_factor = 1.0 / (1.0 + 20.0 * entry.get("volatility", 0.0))
+
+        last_change = entry.get("last_change")
+        if last_change is None:
+            recency_factor = 1.0
+        else:
+            days_since_change = (now - last_change) / (24 * HOUR)
+            recency_factor = min(2.0, 0.5 + days_since_change / 7.0)
+
+        rank = entry.get("rank")
+        rank_factor = 1.0 if rank is None else 0.5 + min(rank, 100) / 100.0
+
+        interval = self.base_interval * volatility_factor * recency_factor
+        interval *= rank_factor
+        return min(max(interval, MIN_INTERVAL), MAX_INTERVAL)
+
+    def _priority(self, entry: Dict[str, Any], now: float) -> float:
+        """How overdue an entry is, relative to its own interval."""
+        next_refresh = entry.get("next_refresh")
+        if next_refresh is None:
+            return float("inf")
+        return (now - next_refresh) / entry.get("interval", self.base_interval)
+
+    def update_rank(self, key: str, rank: Optional[int]) -> None:
+        """Record the bestseller rank of a product."""
+        if rank is None:
+            return
+        with self._lock:
+            self.entries.setdefault(key, {})["rank"] = rank
+
+    def select(
+        self,
+        catalog: Iterable[Tuple[int, Product]],
+        budget: int,
+        now: Optional[float] = None,
+    ) -> List[Tuple[int, Product]]:
+        """Pick the most overdue products of the catalog.
+
+        The catalog is streamed, so only ``budget`` products are kept in
+        memory. Queue entries of products no longer in the catalog are
+        dropped.
+
+        Args:
+            catalog (Iterable[Tuple[int, Product]]): Index and product pairs
+            budget (int): Maximum number of products to pick
+            now (float, optional): Current Unix time
+
+        Returns:
+            List[Tuple[int, Product]]: Due products, most overdue first
+        """
+        now = now or time.time()
+        seen = set()
+        due = []
+        order = 0
+
+        for index, product in catalog:
+            key = self.key(index, product)
+            seen.add(key)
+            entry = self.entries.setdefault(key, {})
+            priority = self._priority(entry, now)
+            if priority < 0:
+                continue
+
+            # The order breaks ties without comparing products
+            item = (priority, -order, index, product)
+            order += 1
+            if len(due) < budget:
+                heapq.heappush(due, item)
+            else:
+                heapq.heappushpop(due, item)
+
+        with self._lock:
+            for key in set(self.entries) - seen:
+                del self.entries[key]
+
+        due.sort(reverse=True)
+        logger.info(f"Selected {len(due)} due products out of {len(seen)}")
+        return [(index, product) for _, _, index, product in due]
+
+    def record(
+        self,
+        key: str,
+        old_price: Optional[float],
+        new_price: Optional[float],
+        now: Optional[float] = None,
+    ) -> None:
+        """Record a refresh and schedule the next one.
+
+        Args:
+            key (str): Queue key of the product
+            old_price (Optional[float]): Stored price before the refresh
+            new_price (Optional[float]): Scraped price, None if it failed
+            now (float, optional): Current Unix time
+        """
+        now = now or time.time()
+        with self._lock:
+            entry = self.entries.setdefault(key, {})
+            entry["last_refresh"] = now
+
+            if new_price is None:
+                # Retry failed refreshes soon, but not in a tight loop
+                entry["interval"] = MIN_INTERVAL
+                entry["next_refresh"] = now + MIN_INTERVAL
+                return
+
+            change = abs(new_price - old_price) / old_price if old_price else 0.0
+            entry["volatility"] = (
+                VOLATILITY_SMOOTHING * change
+                + (1 - VOLATILITY_SMOOTHING) * entry.get("volatility", 0.0)
+            )
+            if change:
+                entry["last_change"] = now
+
+            entry["interval"] = self._interval(entry, now)
+            entry["next_refresh"] = now + entry["interval"]
+
+    def save(self, completed_run: bool = True, now: Optional[float] = None) -> None:
+        """Persist the queue.
+
+        Args:
+            completed_run (bool): Record this as the time of the last refresh
+                run, which the next run's budget is based on
+            now (float, optional): Current Unix time
+        """
+        with self._lock:
+            if completed_run:
+                self.last_run = now or time.time()
+            state = {"last_run": self.last_run, "entries": self.entries}
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, "w") as file:
+                json.dump(state, file)
+            temp_path.replace(self.path)
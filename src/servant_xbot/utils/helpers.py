@@ -1,31 +1,210 @@
+import json
 import logging
 import re
 import os
+from contextlib import contextmanager
 from pathlib import Path
+from urllib.parse import urlparse
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import undetected_chromedriver as uc
 from selenium.webdriver.chrome.options import Options
+from .prices import parse_price
 
 
-def setup_chrome_driver(headless: bool = False) -> uc.Chrome:
+# Only the DOM is scraped, so the lean profile skips media, fonts and trackers
+BLOCKED_URL_PATTERNS = [
+    "*.jpg",
+    "*.jpeg",
+    "*.png",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*.webm",
+    "*.m3u8",
+    "*amazon-adsystem.com*",
+    "*doubleclick.net*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*facebook.net*",
+    "*fls-na.amazon.com*",
+    "*unagi.amazon.com*",
+]
+
+
+def setup_chrome_driver(
+    headless: bool = False,
+    arguments: Optional[List[str]] = None,
+    lean: bool = False,
+    user_data_dir: Optional[Path] = None,
+) -> uc.Chrome:
     """Set up and return a configured Chrome driver.
 
     Args:
         headless (bool): Whether to run Chrome in headless mode
+        arguments (List[str], optional): Extra Chrome command-line arguments
+        lean (bool): Disable images and block the URLs matching
+            ``BLOCKED_URL_PATTERNS``, and record network traffic so
+            ``drain_transferred_bytes`` can report the bytes of each page
+        user_data_dir (Path, optional): Persistent profile directory; a
+            temporary profile is used when not given
 
     Returns:
         uc.Chrome: Configured Chrome driver
     """
     options = uc.ChromeOptions()
 
+    for argument in arguments or []:
+        options.add_argument(argument)
+
     if headless:
         options.headless = True
         options.add_argument("--disable-gpu")
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
 
-    return uc.Chrome(options=options)
+    if lean:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    if user_data_dir:
+        Path(user_data_dir).mkdir(parents=True, exist_ok=True)
+        driver = uc.Chrome(options=options, user_data_dir=str(user_data_dir))
+    else:
+        driver = uc.Chrome(options=options)
+
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+
+    return driver
+
+
+def drain_transferred_bytes(driver: uc.Chrome) -> Optional[int]:
+    """Get the bytes received by a driver since the previous call.
+
+    Reads (and so clears) the performance log of a driver started with
+    ``setup_chrome_driver(lean=True)``.
+
+    Args:
+        driver (uc.Chrome): Driver to inspect
+
+    Returns:
+        Optional[int]: Encoded bytes received, None if the driver does not
+        record its network traffic
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+
+    transferred = 0
+    for entry in entries:
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.loadingFinished":
+            transferred += message["params"].get("encodedDataLength", 0)
+    return int(transferred)
+
+
+class WebDriverCallCounter:
+    """Counts the WebDriver commands sent to chromedriver."""
+
+    def __init__(self):
+        self.calls = 0
+
+
+@contextmanager
+def count_webdriver_calls(driver: uc.Chrome) -> Iterator[WebDriverCallCounter]:
+    """Count every WebDriver command issued through a driver.
+
+    All commands, including the ones issued by WebElement instances, go
+    through ``driver.execute``, so wrapping it gives the exact number of
+    chromedriver round-trips made inside the block.
+
+    Args:
+        driver (uc.Chrome): Driver to instrument
+
+    Yields:
+        WebDriverCallCounter: Counter updated while the block runs
+    """
+    counter = WebDriverCallCounter()
+    had_instance_execute = "execute" in vars(driver)
+    original_execute = driver.execute
+
+    def counting_execute(driver_command, params=None):
+        counter.calls += 1
+        return original_execute(driver_command, params)
+
+    driver.execute = counting_execute
+    try:
+        yield counter
+    finally:
+        if had_instance_execute:
+            driver.execute = original_execute
+        else:
+            del driver.execute
+
+
+ASIN_PATTERN = re.compile(
+    r"/(?:dp|gp/product|gp/aw/d|exec/obidos/ASIN)/([A-Z0-9]{10})(?=[/?#]|$)",
+    re.IGNORECASE,
+)
+
+
+def extract_asin(url: str) -> Optional[str]:
+    """Extract the ASIN from an Amazon product URL.
+
+    Args:
+        url (str): Amazon product URL
+
+    Returns:
+        Optional[str]: Upper-case ASIN or None if the URL has no ASIN
+    """
+    if not url:
+        return None
+
+    asin_match = ASIN_PATTERN.search(url)
+    return asin_match.group(1).upper() if asin_match else None
+
+
+AMAZON_PRODUCT_URL = "https://www.amazon.com.br/dp/{asin}"
+SHORT_LINK_HOSTS = ("amzn.to", "a.co")
+
+
+def canonicalize_product_url(url: str) -> Optional[str]:
+    """Build the canonical product URL, without ref or query junk.
+
+    Args:
+        url (str): Any Amazon product URL containing an ASIN
+
+    Returns:
+        Optional[str]: Canonical ``/dp/<ASIN>`` URL or None if the URL has no
+        ASIN (e.g. a short link that still needs to be resolved)
+    """
+    asin = extract_asin(url)
+    return AMAZON_PRODUCT_URL.format(asin=asin) if asin else None
+
+
+def is_short_link(url: str) -> bool:
+    """Check if a URL is an Amazon short link such as ``amzn.to``.
+
+    Args:
+        url (str): URL to check
+
+    Returns:
+        bool: True if the URL needs a redirect to reveal the product
+    """
+    host = urlparse(url or "").netloc.lower()
+    return host in SHORT_LINK_HOSTS or host.endswith(".amzn.to")
 
 
 def extract_price_from_text(text: str) -> Optional[float]:
@@ -38,15 +217,7 @@ def extract_price_from_text(text: str) -> Optional[float]:
         Optional[float]: Extracted price as float or None if extraction fails
     """
     try:
-        if not text:
-            return None
-
-        price_match = re.search(r"R\$\s*([\d.,]+)", text)
-        if not price_match:
-            return None
-
-        price_str = price_match.group(1).replace(".", "").replace(",", ".")
-        return float(price_str)
+        return parse_price(text)
     except Exception:
         return None
 
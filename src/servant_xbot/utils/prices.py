@@ -0,0 +1,62 @@
+import re
+from typing import Iterable, Optional
+import numpy as np
+
+# "R$ 1.234,56", "R$1.234,56", and the whole and fraction spans of Amazon's
+# price markup read as text, e.g. "R$\n1.234\n,\n56". Only the first price is
+# used, which is the lower bound of a range such as "R$ 49,90 - R$ 89,90".
+# A fraction of more than two digits ("R$ 1,234") is rejected, not truncated.
+CURRENCY_PRICE_PATTERN = re.compile(
+    r"R\$\s*(\d[\d.]*)(?![\d.])(?:\s*,\s*(\d{0,2})(?!\d)|(?!\s*,\s*\d))"
+)
+
+# A bare amount making up the whole text, as read from a ".a-price-whole"
+# span ("1.234,") or from the whole and fraction spans without the symbol.
+# Only tried when asked for, since any number would match, e.g. "4.5" or "12".
+BARE_PRICE_PATTERN = re.compile(r"\s*(\d[\d.]*)(?:\s*,\s*(\d{0,2}))?\s*$")
+
+
+def _amount(match: re.Match) -> float:
+    """Convert a matched whole part ("1.234") and fraction ("56") to a float."""
+    return float(f"{match[1].replace('.', '')}.{match[2] or 0}")
+
+
+def parse_price(text: Optional[str], bare: bool = False) -> Optional[float]:
+    """Extract the price of a text in Brazilian currency format.
+
+    Args:
+        text (str): Text containing a price, e.g. ``R$ 1.234,56``
+        bare (bool): Also accept a text that is only an amount, e.g. ``1.234,``
+
+    Returns:
+        Optional[float]: Extracted price or None if the text has none
+    """
+    if not text:
+        return None
+    match = CURRENCY_PRICE_PATTERN.search(text)
+    if match is None and bare:
+        match = BARE_PRICE_PATTERN.match(text)
+    return _amount(match) if match else None
+
+
+def parse_prices(texts: Iterable[Optional[str]], bare: bool = False) -> np.ndarray:
+    """Extract the prices of many texts at once.
+
+    A Python loop over the texts like ``parse_price``, as fast as calling it
+    per text. Failures are NaN instead of None, so the result is a float64
+    column, the layout of the ``ProductBatch`` price columns.
+
+    Args:
+        texts (Iterable[Optional[str]]): Texts containing prices
+        bare (bool): Also accept texts that are only an amount, e.g. ``1.234,``
+
+    Returns:
+        np.ndarray: float64 prices, NaN where a text has none
+    """
+    texts = [text or "" for text in texts]
+    prices = []
+    for match, text in zip(map(CURRENCY_PRICE_PATTERN.search, texts), texts):
+        if match is None and bare:
+            match = BARE_PRICE_PATTERN.match(text)
+        prices.append(_amount(match) if match else np.nan)
+    return np.array(prices, dtype=np.float64)
@@ -0,0 +1,142 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+from config.settings import (
+    ERROR_LOG_PATH,
+    RATE_LIMIT_INITIAL_PER_MINUTE,
+    RATE_LIMIT_JITTER,
+    RATE_LIMIT_MAX_PER_MINUTE,
+    RATE_LIMIT_MIN_PER_MINUTE,
+)
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+
+class RateLimiter:
+    """Thread-safe token bucket whose rate adapts to Amazon's responses.
+
+    The rate grows additively after every clean response and is halved when a
+    captcha page, a 503 or an empty selector result is reported (AIMD), so
+    throughput rises while Amazon is happy and backs off as soon as it is not.
+    The random politeness dwell is added here, before navigation, so the time
+    spent waiting for a page afterwards is its real load time.
+    """
+
+    def __init__(
+        self,
+        initial_per_minute: float = RATE_LIMIT_INITIAL_PER_MINUTE,
+        min_per_minute: float = RATE_LIMIT_MIN_PER_MINUTE,
+        max_per_minute: float = RATE_LIMIT_MAX_PER_MINUTE,
+        jitter: float = RATE_LIMIT_JITTER,
+        burst: float = 1.0,
+        increase_per_minute: float = 1.0,
+        decrease_factor: float = 0.5,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            initial_per_minute (float): Starting request rate
+            min_per_minute (float): Lowest rate reached while backing off
+            max_per_minute (float): Highest rate reached while speeding up
+            jitter (float): Extra random delay, as a fraction of the current
+                interval between requests
+            burst (float): Tokens that can accumulate while idle
+            increase_per_minute (float): Rate added after a clean response
+            decrease_factor (float): Rate multiplier applied on a failure
+        """
+        self.min_rate = min_per_minute / 60
+        self.max_rate = max_per_minute / 60
+        self.jitter = jitter
+        self.burst = burst
+        self.increase = increase_per_minute / 60
+        self.decrease_factor = decrease_factor
+        self.successes = 0
+        self.failures = 0
+        self.waited_seconds = 0.0
+        self._rate = min(max(initial_per_minute / 60, self.min_rate), self.max_rate)
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def current_rate(self) -> float:
+        """Current request rate, in requests per minute."""
+        return self._rate * 60
+
+    def acquire(self) -> float:
+        """Block until the next request may be sent.
+
+        Returns:
+            float: Seconds waited
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            # A negative balance reserves a future token for this caller
+            delay = max(0.0, (1.0 - self._tokens) / self._rate)
+            self._tokens -= 1.0
+            delay += random.uniform(0, self.jitter / self._rate)
+            self.waited_seconds += delay
+
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def record_success(self) -> None:
+        """Report a clean response, speeding up additively."""
+        with self._lock:
+            self.successes += 1
+            self._rate = min(self.max_rate, self._rate + self.increase)
+
+    def record_failure(self, reason: str) -> None:
+        """Report a captcha, 503 or empty result, backing off multiplicatively.
+
+        Args:
+            reason (str): What went wrong, for the log
+        """
+        with self._lock:
+            self.failures += 1
+            self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+        logger.warning(
+            f"Backing off after {reason}, rate now {self.current_rate:.1f}/min"
+        )
+
+    def metrics(self) -> Dict[str, float]:
+        """Snapshot of the limiter state."""
+        return {
+            "rate_per_minute": self.current_rate,
+            "successes": self.successes,
+            "failures": self.failures,
+            "waited_seconds": self.waited_seconds,
+        }
+
+    def log_stats(self) -> None:
+        """Log the rate and counters of the run."""
+        metrics = self.metrics()
+        logger.info(
+            f"Rate limiter: {metrics['rate_per_minute']:.1f} requests/min, "
+            f"{metrics['successes']} clean responses, "
+            f"{metrics['failures']} back-offs, "
+            f"{metrics['waited_seconds']:.0f}s waited"
+        )
+
+
+_shared_rate_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Get the rate limiter shared by every driver, HTTP client and thread."""
+    global _shared_rate_limiter
+    with _shared_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = RateLimiter()
+        return _shared_rate_limiter
@@ -0,0 +1,155 @@
+import atexit
+import base64
+import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+import undetected_chromedriver as uc
+from selenium.common.exceptions import WebDriverException
+from config.settings import (
+    ERROR_LOG_PATH,
+    SCREENSHOT_DIR,
+    SCREENSHOT_MAX_MB,
+    SCREENSHOT_MODE,
+    SCREENSHOT_SAMPLE_RATE,
+)
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+MODES = ("off", "failure", "sampled")
+JPEG_QUALITY = 60
+
+
+class ScreenshotRecorder:
+    """Captures debugging screenshots without blocking the scraping threads.
+
+    Modes:
+        off: never capture
+        failure: capture only when something went wrong
+        sampled: capture failures, plus a random share of the other pages
+
+    The browser returns the screenshot already encoded, as JPEG when CDP is
+    available. Decoding and writing happen on a background thread, into a
+    ring directory whose oldest files are evicted once it outgrows its size
+    cap.
+    """
+
+    def __init__(
+        self,
+        directory: Path = SCREENSHOT_DIR,
+        mode: str = SCREENSHOT_MODE,
+        sample_rate: float = SCREENSHOT_SAMPLE_RATE,
+        max_mb: float = SCREENSHOT_MAX_MB,
+    ):
+        """Initialize the recorder.
+
+        Args:
+            directory (Path): Ring directory holding the screenshots
+            mode (str): One of ``off``, ``failure`` or ``sampled``
+            sample_rate (float): Share of non-failure captures kept in
+                ``sampled`` mode
+            max_mb (float): Size cap of the ring directory in megabytes
+        """
+        if mode not in MODES:
+            logger.warning(f"Unknown screenshot mode {mode!r}, using 'failure'")
+            mode = "failure"
+        self.directory = Path(directory)
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.captured = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="screenshots"
+        )
+        atexit.register(self.close)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = sorted(self.directory.iterdir(), key=lambda f: f.stat().st_mtime)
+        self._files = [(f, f.stat().st_size) for f in files if f.is_file()]
+        self._total_bytes = sum(size for _, size in self._files)
+
+    def _should_capture(self, failure: bool) -> bool:
+        if self.mode == "off":
+            return False
+        if failure:
+            return True
+        return self.mode == "sampled" and random.random() < self.sample_rate
+
+    def capture(self, driver: uc.Chrome, name: str, failure: bool = False) -> bool:
+        """Capture the current page if the mode asks for it.
+
+        Args:
+            driver (uc.Chrome): Driver showing the page
+            name (str): Short description used in the file name
+            failure (bool): Whether the page is being captured because
+                something went wrong
+
+        Returns:
+            bool: True if a capture was queued
+        """
+        if not self._should_capture(failure):
+            return False
+
+        try:
+            try:
+                data = driver.execute_cdp_cmd(
+                    "Page.captureScreenshot",
+                    {"format": "jpeg", "quality": JPEG_QUALITY},
+                )["data"]
+                extension = "jpg"
+            except (AttributeError, KeyError, WebDriverException):
+                data = driver.get_screenshot_as_base64()
+                extension = "png"
+        except Exception as e:
+            logger.warning(f"Could not capture screenshot {name}: {str(e)}")
+            return False
+
+        safe_name = re.sub(r"[^\w.-]+", "_", name).strip("_")[:80]
+        path = self.directory / f"{time.time_ns()}_{safe_name}.{extension}"
+        self._executor.submit(self._write, path, data)
+        return True
+
+    def _write(self, path: Path, data: str) -> None:
+        """Decode and write a capture, then evict the oldest files."""
+        try:
+            content = base64.b64decode(data)
+            path.write_bytes(content)
+        except (ValueError, OSError) as e:
+            logger.error(f"Error writing screenshot {path.name}: {str(e)}")
+            return
+
+        with self._lock:
+            self.captured += 1
+            self._files.append((path, len(content)))
+            self._total_bytes += len(content)
+            while self._total_bytes > self.max_bytes and len(self._files) > 1:
+                oldest, size = self._files.pop(0)
+                oldest.unlink(missing_ok=True)
+                self._total_bytes -= size
+                self.evicted += 1
+
+    def close(self) -> None:
+        """Wait for queued captures to be written."""
+        self._executor.shutdown(wait=True)
+
+
+_shared_recorder: Optional[ScreenshotRecorder] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_screenshot_recorder() -> ScreenshotRecorder:
+    """Get the screenshot recorder shared by every driver of the process."""
+    global _shared_recorder
+    with _shared_lock:
+        if _shared_recorder is None:
+            _shared_recorder = ScreenshotRecorder()
+        return _shared_recorder
@@ -0,0 +1,193 @@
+import json
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Sequence, TypeVar
+from config.settings import ERROR_LOG_PATH, SELECTOR_STATS_PATH
+
+
+logger = logging.getLogger(__name__)
+handler = logging.FileHandler(ERROR_LOG_PATH)
+logger.addHandler(handler)
+
+Selector = TypeVar("Selector", bound=Hashable)
+
+# Weight of the newest attempt in a selector's success rate
+SUCCESS_SMOOTHING = 0.3
+# Success rate assumed for selectors that were never tried
+UNTRIED_SUCCESS_RATE = 0.5
+
+
+class SelectorAttempt:
+    """Outcome of trying one selector, set by the caller."""
+
+    def __init__(self):
+        self.hit = False
+
+
+class SelectorRegistry:
+    """Learns which fallback selector works for each page type.
+
+    Every attempt updates the selector's hit/miss/latency counters and an
+    exponential moving average of its success rate. Lists are tried in order
+    of that rate, so the current winner comes first and a selector broken by
+    a layout change drops behind the others after a couple of misses. The
+    statistics are persisted between runs.
+    """
+
+    def __init__(self, path: Path = SELECTOR_STATS_PATH):
+        """Load the persisted statistics.
+
+        Args:
+            path (Path): JSON file holding the statistics
+        """
+        self.path = Path(path)
+        self.stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.save)
+
+        try:
+            with open(self.path, "r") as file:
+                self.stats = json.load(file)
+        except FileNotFoundError:
+            pass
+        except (ValueError, OSError) as e:
+            logger.error(f"Error loading selector stats, starting empty: {str(e)}")
+
+    @staticmethod
+    def key(selector: Hashable) -> str:
+        """Get the statistics key of a selector, e.g. ``css selector=#ASIN``."""
+        if isinstance(selector, tuple):
+            return "=".join(str(part) for part in selector)
+        return str(selector)
+
+    def ordered(self, page_type: str, selectors: Sequence[Selector]) -> List[Selector]:
+        """Sort selectors by recent success rate, keeping ties in given order.
+
+        Args:
+            page_type (str): Page and field the selectors target, e.g.
+                ``product.price``
+            selectors (Sequence): Fallback selectors in their default order
+
+        Returns:
+            List: The same selectors, most successful first
+        """
+        with self._lock:
+            page_stats = self.stats.get(page_type, {})
+            rates = [
+                page_stats.get(self.key(selector), {}).get(
+                    "success_rate", UNTRIED_SUCCESS_RATE
+                )
+                for selector in selectors
+            ]
+        order = sorted(range(len(selectors)), key=lambda i: (-rates[i], i))
+        return [selectors[i] for i in order]
+
+    def record(
+        self, page_type: str, selector: Hashable, hit: bool, latency: float
+    ) -> None:
+        """Record one attempt of a selector.
+
+        Args:
+            page_type (str): Page and field the selector targets
+            selector (Hashable): Selector that was tried
+            hit (bool): Whether it found what it was looking for
+            latency (float): Seconds the attempt took
+        """
+        with self._lock:
+            entry = self.stats.setdefault(page_type, {}).setdefault(
+                self.key(selector),
+                {
+                    "hits": 0,
+                    "misses": 0,
+                    "latency": 0.0,
+                    "success_rate": UNTRIED_SUCCESS_RATE,
+                },
+            )
+            entry["hits" if hit else "misses"] += 1
+            entry["latency"] += latency
+            entry["success_rate"] = (
+                SUCCESS_SMOOTHING * hit
+                + (1 - SUCCESS_SMOOTHING) * entry["success_rate"]
+            )
+
+    @contextmanager
+    def attempt(
+        self, page_type: str, selector: Hashable
+    ) -> Iterator[SelectorAttempt]:
+        """Time an attempt of a selector and record it on exit.
+
+        Set ``hit`` on the yielded attempt when the selector matched. An
+        exception raised inside the block is recorded as a miss.
+
+        Example:
+            with registry.attempt("product.name", "#productTitle") as attempt:
+                attempt.hit = soup.select_one("#productTitle") is not None
+        """
+        attempt = SelectorAttempt()
+        start = time.monotonic()
+        try:
+            yield attempt
+        finally:
+            self.record(page_type, selector, attempt.hit, time.monotonic() - start)
+
+    def counters(self, page_type: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Get hit/miss counts, mean latency and success rate per selector.
+
+        Args:
+            page_type (str, optional): Only return this page type
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Counters keyed by ``page_type`` and
+            selector key joined with a space
+        """
+        with self._lock:
+            return {
+                f"{name} {key}": {
+                    "hits": entry["hits"],
+                    "misses": entry["misses"],
+                    "mean_latency": entry["latency"]
+                    / max(1, entry["hits"] + entry["misses"]),
+                    "success_rate": entry["success_rate"],
+                }
+                for name, page_stats in self.stats.items()
+                if page_type in (None, name)
+                for key, entry in page_stats.items()
+            }
+
+    def log_stats(self) -> None:
+        """Log the counters of every selector that missed at least once."""
+        for name, counter in self.counters().items():
+            if counter["misses"]:
+                logger.info(
+                    f"Selector {name}: {counter['hits']} hits, "
+                    f"{counter['misses']} misses, "
+                    f"{counter['mean_latency'] * 1000:.0f} ms mean"
+                )
+
+    def save(self) -> None:
+        """Persist the statistics."""
+        with self._lock:
+            try:
+                temp_path = self.path.with_suffix(".tmp")
+                with open(temp_path, "w") as file:
+                    json.dump(self.stats, file)
+                temp_path.replace(self.path)
+            except OSError as e:
+                logger.error(f"Error saving selector stats: {str(e)}")
+
+
+_shared_selector_registry: Optional[SelectorRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_selector_registry() -> SelectorRegistry:
+    """Get the selector registry shared by every scraper of the process."""
+    global _shared_selector_registry
+    with _shared_lock:
+        if _shared_selector_registry is None:
+            _shared_selector_registry = SelectorRegistry()
+        return _shared_selector_registry